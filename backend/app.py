@@ -1,185 +1,250 @@
 # backend/app.py
 import os
+
+if os.environ.get('WSGI_WORKER') == 'gevent':
+    # Patch sockets before flask, requests or the OpenAI client import them
+    from gevent import monkey
+    monkey.patch_all()
+    
+    if (os.environ.get('DATABASE_URL') or '').startswith('postgres'):
+        # psycopg2 talks to the server from C; its wait callback makes queries yield too
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+
+import json
+import logging
 import sys
-from flask import Flask, jsonify, request
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as ProbeTimeout
+from flask import Flask, request
+from flask_compress import Compress
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
 
 # Add backend to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from config import get_config, init_directories, validate_azure_openai_config
+from config import get_config, validate_azure_openai_config
 from models import init_db
-from routes import register_blueprints
-from services.azure_openai_service import get_azure_openai_service
+from services.azure_openai_service import init_ai_slots
+from utils.database import configure_sqlite_engine
+from utils.json import OrjsonProvider, ojsonify
+from utils.rate_limit import init_limiter
+from utils.responses import prebuilt_json_response
+from utils.validators import validate_email
 
+# Last /health probe result, shared by all requests in this worker; 'probe' is the
+# probe in flight, so only one runs at a time
+_HEALTH_CACHE = {'ts': 0.0, 'response': None, 'probe': None}
+_HEALTH_LOCK = threading.Lock()
+_HEALTH_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='health-probe')
 
-def create_app(config_name=None):
-    """Create and configure Flask application"""
+# Fixed error payloads, serialized once at import
+_NOT_FOUND = prebuilt_json_response({'success': False, 'message': 'Endpoint not found'}, 404)
+_METHOD_NOT_ALLOWED = prebuilt_json_response({'success': False, 'message': 'Method not allowed'}, 405)
+_INTERNAL_ERROR = prebuilt_json_response({'success': False, 'message': 'Internal server error'}, 500)
+_RATE_LIMITED_PREFIX = b'{"success": false, "message": "Rate limit exceeded", "retry_after": '
+
+
+def create_core_app():
+    """Create the bare Flask application with configuration and CORS only"""
     app = Flask(__name__)
     
+    # Serialize JSON (including jsonify) with orjson
+    app.json_provider_class = OrjsonProvider
+    app.json = OrjsonProvider(app)
+    
     # Load configuration
     config_class = get_config()
     app.config.from_object(config_class)
     
-    # Initialize directories
-    init_directories()
+    # Initialize CORS
+    CORS(app, origins=app.config['CORS_ORIGINS'])
+    
+    return app
+
+
+def create_app(config_name=None):
+    """Create and configure Flask application"""
+    app = create_core_app()
     
     # Initialize database
     db = init_db(app)
+    with app.app_context():
+        configure_sqlite_engine(db.engine)
     
-    # Initialize CORS
-    CORS(app, origins=app.config['CORS_ORIGINS'])
+    # Initialize rate limiter
+    limiter = init_limiter(app)
     
-    # Initialize JWT
-    jwt = JWTManager(app)
+    # Compress JSON responses (off via COMPRESS_REGISTER when a proxy compresses instead)
+    Compress(app)
     
-    # Initialize rate limiter
-    limiter = Limiter(
-        key_func=get_remote_address,
-        app=app,
-        default_limits=[app.config['RATELIMIT_DEFAULT']],
-        storage_uri=app.config['RATELIMIT_STORAGE_URL']
-    )
-    
-    # JWT error handlers
-    @jwt.expired_token_loader
-    def expired_token_callback(jwt_header, jwt_payload):
-        return jsonify({
-            'success': False,
-            'message': 'Token has expired'
-        }), 401
-    
-    @jwt.invalid_token_loader
-    def invalid_token_callback(error):
-        app.logger.error(f"Invalid token error: {error}")
-        return jsonify({
-            'success': False,
-            'message': 'Invalid token'
-        }), 401
-    
-    @jwt.unauthorized_loader
-    def missing_token_callback(error):
-        return jsonify({
-            'success': False,
-            'message': 'Authorization token is required'
-        }), 401
+    # Shared cap on threads blocked on Azure OpenAI (rule suggestions and scrape analysis)
+    init_ai_slots(app)
     
     # Global error handlers
     @app.errorhandler(404)
     def not_found(error):
-        return jsonify({
-            'success': False,
-            'message': 'Endpoint not found'
-        }), 404
+        return _NOT_FOUND()
     
     @app.errorhandler(405)
     def method_not_allowed(error):
-        return jsonify({
-            'success': False,
-            'message': 'Method not allowed'
-        }), 405
+        return _METHOD_NOT_ALLOWED()
     
     @app.errorhandler(429)
     def ratelimit_handler(e):
-        return jsonify({
-            'success': False,
-            'message': 'Rate limit exceeded',
-            'retry_after': str(e.retry_after)
-        }), 429
+        # Only the retry_after value varies, so splice it onto the serialized prefix
+        body = _RATE_LIMITED_PREFIX + json.dumps(str(e.retry_after)).encode('utf-8') + b'}'
+        return app.response_class(body, status=429, mimetype='application/json')
     
     @app.errorhandler(500)
     def internal_error(error):
         app.logger.error(f"Internal server error: {error}")
-        return jsonify({
-            'success': False,
-            'message': 'Internal server error'
-        }), 500
+        return _INTERNAL_ERROR()
     
     # Health check endpoint
-    @app.route('/health')
-    def health_check():
+    def probe_health():
         try:
             from sqlalchemy import text
-            # Check database connection
-            with app.app_context():
-                db.session.execute(text('SELECT 1'))
+            # Check database connection (the request's app context is already active)
+            db.session.execute(text('SELECT 1'))
             
             # Check Azure OpenAI service
+            from services.azure_openai_service import get_azure_openai_service
             ai_service = get_azure_openai_service()
             ai_status = ai_service.get_service_status()
             
-            return jsonify({
+            return {
                 'status': 'healthy',
                 'database': 'connected',
                 'azure_openai': 'available' if ai_status['available'] else 'unavailable',
                 'version': app.config.get('APP_VERSION', '1.0.0')
-            }), 200
+            }, 200
             
         except Exception as e:
             app.logger.error(f"Health check failed: {e}")
-            return jsonify({
+            return {
                 'status': 'unhealthy',
                 'error': str(e)
-            }), 503
+            }, 503
+    
+    def run_probe():
+        with app.app_context():
+            return probe_health()
+    
+    def probe_done(future):
+        payload, code = future.result()
+        with _HEALTH_LOCK:
+            # Encoded once per probe; polls in between reuse the same bytes
+            _HEALTH_CACHE.update(ts=time.monotonic(), response=prebuilt_json_response(payload, code), probe=None)
+    
+    @app.route('/health')
+    def health_check():
+        # Serve the cached probe result so frequent polling hits the DB at most once per TTL.
+        # The lock only guards the cache; the probe itself runs outside it.
+        started = False
+        with _HEALTH_LOCK:
+            response = _HEALTH_CACHE['response']
+            fresh = response is not None and time.monotonic() - _HEALTH_CACHE['ts'] < app.config['HEALTH_CHECK_CACHE_TIMEOUT']
+            probe = _HEALTH_CACHE['probe']
+            if not fresh and probe is None:
+                probe = _HEALTH_CACHE['probe'] = _HEALTH_EXECUTOR.submit(run_probe)
+                started = True
+        
+        if started:
+            probe.add_done_callback(probe_done)
+        
+        # Polls during a refresh get the previous result instead of waiting on it
+        if fresh or (response is not None and not started):
+            return response()
+        
+        try:
+            payload, code = probe.result(timeout=app.config['HEALTH_CHECK_TIMEOUT'])
+        except ProbeTimeout:
+            payload, code = {'status': 'unhealthy', 'error': 'Health check timed out'}, 503
+            # Reported until the hung probe finishes; no second probe is started meanwhile
+            with _HEALTH_LOCK:
+                if _HEALTH_CACHE['probe'] is probe:
+                    _HEALTH_CACHE.update(ts=time.monotonic(), response=prebuilt_json_response(payload, code))
+        
+        return prebuilt_json_response(payload, code)()
+    
+    # API info endpoint - the payload is fixed for the life of the process
+    info_response = prebuilt_json_response({
+        'name': app.config.get('APP_NAME', 'Blitz'),
+        'version': app.config.get('APP_VERSION', '1.0.0'),
+        'environment': os.environ.get('FLASK_ENV', 'development'),
+        'endpoints': {
+            'auth': '/api/auth/*',
+            'projects': '/api/projects/*',
+            'websites': '/api/websites/*',
+            'scraping': '/api/scraping/*',
+            'content': '/api/content/*',
+            'reports': '/api/reports/*',
+            'admin': '/api/admin/*'
+        }
+    }, 200)
     
-    # API info endpoint
     @app.route('/api/info')
     def api_info():
-        return jsonify({
-            'name': app.config.get('APP_NAME', 'Blitz'),
-            'version': app.config.get('APP_VERSION', '1.0.0'),
-            'environment': os.environ.get('FLASK_ENV', 'development'),
-            'endpoints': {
-                'auth': '/api/auth/*',
-                'projects': '/api/projects/*',
-                'websites': '/api/websites/*',
-                'scraping': '/api/scraping/*',
-                'content': '/api/content/*',
-                'reports': '/api/reports/*',
-                'admin': '/api/admin/*'
-            }
-        }), 200
+        return info_response()
+    
+    # Answer probe endpoints ahead of every other before_request hook (rate
+    # limiting included), so frequent load balancer polling is never throttled
+    fast_paths = {'/health': health_check, '/api/info': api_info}
+    
+    def fast_dispatch():
+        view = fast_paths.get(request.path)
+        if view is not None and request.method in ('GET', 'HEAD'):
+            return view()
+        return None
+    
+    app.before_request_funcs.setdefault(None, []).insert(0, fast_dispatch)
     
     # Debug endpoint for email validation
     @app.route('/api/debug/validate-email', methods=['POST'])
     def debug_validate_email():
         if not app.config.get('DEBUG'):
-            return jsonify({'error': 'Debug endpoint not available'}), 404
+            return ojsonify({'error': 'Debug endpoint not available'}), 404
         
         data = request.get_json()
         if not data or 'email' not in data:
-            return jsonify({'error': 'Email required'}), 400
+            return ojsonify({'error': 'Email required'}), 400
         
-        from utils.validators import validate_email
         email = data['email']
         is_valid = validate_email(email)
         
-        return jsonify({
+        return ojsonify({
             'email': email,
             'valid': is_valid,
             'message': 'Valid email format' if is_valid else 'Invalid email format'
         }), 200
     
-    # Register blueprints
+    # Register blueprints - must happen before the first request is dispatched,
+    # so only the import is deferred to here
+    from routes import register_blueprints
     register_blueprints(app)
     
-    # Log startup information
-    with app.app_context():
-        app.logger.info(f"🚀 {app.config.get('APP_NAME')} starting up...")
-        app.logger.info(f"   Environment: {os.environ.get('FLASK_ENV', 'development')}")
-        app.logger.info(f"   Debug mode: {app.config.get('DEBUG', False)}")
-        app.logger.info(f"   Port: {app.config.get('FLASK_PORT', 5232)}")
-        app.logger.info(f"   JWT Secret Key configured: {bool(app.config.get('JWT_SECRET_KEY'))}")
-        
-        # Validate Azure OpenAI configuration
-        validation = validate_azure_openai_config(app.config)
-        if validation['valid']:
-            app.logger.info("   ✅ Azure OpenAI: Configured")
-        else:
-            app.logger.warning(f"   ⚠️  Azure OpenAI: Missing fields {validation['missing_fields']}")
+    # Log startup information as a single record
+    validation = validate_azure_openai_config(app.config)
+    if app.logger.isEnabledFor(logging.INFO):
+        app.logger.info(
+            "🚀 %s starting up...\n"
+            "   Environment: %s\n"
+            "   Debug mode: %s\n"
+            "   Port: %s\n"
+            "   JWT Secret Key configured: %s\n"
+            "   Azure OpenAI: %s",
+            app.config.get('APP_NAME'),
+            os.environ.get('FLASK_ENV', 'development'),
+            app.config.get('DEBUG', False),
+            app.config.get('FLASK_PORT', 5232),
+            bool(app.config.get('JWT_SECRET_KEY')),
+            '✅ Configured' if validation['valid'] else '⚠️  Not configured'
+        )
+    
+    if not validation['valid']:
+        app.logger.warning(f"   ⚠️  Azure OpenAI: Missing fields {validation['missing_fields']}")
     
     return app
 
@@ -201,12 +266,27 @@ def run_app():
     print()
     
     try:
-        app.run(
-            host=host,
-            port=port,
-            debug=False,
-            threaded=True
-        )
+        if os.environ.get('WSGI_WORKER') == 'gevent':
+            # Greenlet per request: blocking DB/HTTP calls yield instead of holding a thread
+            from gevent.pywsgi import WSGIServer
+            WSGIServer((host, port), app).serve_forever()
+        elif os.environ.get('FLASK_ENV', 'development') == 'development':
+            app.run(
+                host=host,
+                port=port,
+                debug=False,
+                threaded=True
+            )
+        else:
+            # Production WSGI server; create_app has already imported every blueprint
+            from waitress import serve
+            serve(
+                app,
+                host=host,
+                port=port,
+                threads=max(16, (os.cpu_count() or 1) * 2),
+                connection_limit=1000
+            )
     except KeyboardInterrupt:
         print("\n👋 Shutting down gracefully...")
     except Exception as e:
@@ -1,6 +1,22 @@
 # backend/config.py
 import os
 from datetime import timedelta
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def _cors_origins():
+    """Build the allowed CORS origins once per process"""
+    react_port = os.environ.get('REACT_PORT', 3232)
+    return frozenset({
+        f"http://localhost:{react_port}",
+        f"http://127.0.0.1:{react_port}",
+        "http://localhost:3232",
+        "http://127.0.0.1:3232",
+        "http://localhost:3000",  # Default React port fallback
+        "http://127.0.0.1:3000"   # Default React port fallback
+    })
+
 
 class Config:
     """Base configuration class"""
@@ -11,9 +27,23 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_timeout': 20,
-        'pool_recycle': -1,
-        'pool_pre_ping': True
+        'pool_recycle': 1800,
+        'pool_pre_ping': False,  # Costs an extra SELECT 1 per checkout; enabled in production only
+        'query_cache_size': 1200  # Compiled statement cache (default 500); raw admin SQL would otherwise evict hot ORM queries
     }
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    if SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        # Pooled connections are shared across request threads
+        SQLALCHEMY_ENGINE_OPTIONS['connect_args'] = {'check_same_thread': False}
+    else:
+        SQLALCHEMY_ENGINE_OPTIONS.update({
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_use_lifo': True  # Reuse the warmest connections so idle extras can be recycled
+        })
+        if SQLALCHEMY_DATABASE_URI.startswith('postgres'):
+            # The server cancels runaway queries, e.g. from the admin SQL executor
+            SQLALCHEMY_ENGINE_OPTIONS['connect_args'] = {'options': f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}'}
     
     # Server configuration with new default ports
     FLASK_HOST = os.environ.get('FLASK_HOST', '0.0.0.0')
@@ -25,21 +55,22 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     JWT_ALGORITHM = 'HS256'
+    JWT_DECODE_CACHE_TTL = int(os.environ.get('JWT_DECODE_CACHE_TTL', 60))  # Seconds a verified token is trusted without re-verifying
+    JWT_ROLE_CLAIM_MAX_AGE = int(os.environ.get('JWT_ROLE_CLAIM_MAX_AGE', 300))  # Seconds a token's role claim is trusted without checking the user
     
     # File upload configuration
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or 'uploads'
     MAX_CONTENT_LENGTH = 100 * 1024 * 1024  # 100MB max file size
     ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls', 'json', 'txt', 'pdf'}
     
+    # Export downloads: internal nginx location serving the exports directory (X-Accel-Redirect),
+    # or X-Sendfile for Apache/lighttpd; both leave the file transfer to the web server
+    EXPORT_ACCEL_REDIRECT_PREFIX = os.environ.get('EXPORT_ACCEL_REDIRECT_PREFIX', '')
+    EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS', 2))  # Background threads building exports
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'
+    
     # CORS Configuration with new ports
-    CORS_ORIGINS = [
-        f"http://localhost:{os.environ.get('REACT_PORT', 3232)}",
-        f"http://127.0.0.1:{os.environ.get('REACT_PORT', 3232)}",
-        "http://localhost:3232",
-        "http://127.0.0.1:3232",
-        "http://localhost:3000",  # Default React port fallback
-        "http://127.0.0.1:3000"   # Default React port fallback
-    ]
+    CORS_ORIGINS = _cors_origins()
     
     # Azure OpenAI Configuration
     AZURE_OPENAI_ENDPOINT = os.environ.get('AZURE_OPENAI_ENDPOINT', 'https://prave-mcngte2t-eastus2.cognitiveservices.azure.com/openai/deployments/gpt-4.1-nano/chat/completions?api-version=2025-01-01-preview')
@@ -49,11 +80,28 @@ class Config:
     AZURE_OPENAI_MODEL = os.environ.get('AZURE_OPENAI_MODEL', 'gpt-4.1-nano')
     AZURE_OPENAI_MAX_TOKENS = int(os.environ.get('AZURE_OPENAI_MAX_TOKENS', 4000))
     AZURE_OPENAI_TEMPERATURE = float(os.environ.get('AZURE_OPENAI_TEMPERATURE', 0.7))
+    AZURE_OPENAI_MAX_CONCURRENT = int(os.environ.get('AZURE_OPENAI_MAX_CONCURRENT', 4))  # Request threads allowed to wait on the AI at once
     
     # Rate Limiting Configuration
     RATELIMIT_STORAGE_URL = os.environ.get('REDIS_URL') or 'memory://'
     RATELIMIT_DEFAULT = "1000 per hour"
     RATELIMIT_HEADERS_ENABLED = True
+    RATELIMIT_LOCAL_BUDGET = float(os.environ.get('RATELIMIT_LOCAL_BUDGET', 0.9))  # Share of the limit counted in-process
+    RATELIMIT_LOCAL_BATCH = float(os.environ.get('RATELIMIT_LOCAL_BATCH', 0.1))  # Share of the limit written to storage per batch of local hits
+    RATELIMIT_LOGIN = "5 per minute;100 per hour"  # Per client IP
+    RATELIMIT_LOGIN_ACCOUNT = "20 per hour"  # Per email address, across IPs
+    
+    # Response compression - JSON listings repeat keys and URLs, so they shrink several-fold
+    COMPRESS_REGISTER = os.environ.get('COMPRESS_RESPONSES', 'true').lower() == 'true'
+    COMPRESS_MIMETYPES = ['application/json']
+    COMPRESS_ALGORITHM = ['br', 'gzip']
+    COMPRESS_LEVEL = 4  # gzip
+    COMPRESS_BR_LEVEL = 4
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_STREAMS = False  # Streamed SQL results are sent as they are produced
+    
+    # Blueprints to register (comma separated names, empty for all)
+    ENABLED_BLUEPRINTS = [name.strip() for name in os.environ.get('ENABLED_BLUEPRINTS', '').split(',') if name.strip()]
     
     # Logging Configuration
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
@@ -99,6 +147,8 @@ class Config:
     # Cache Configuration
     CACHE_TYPE = os.environ.get('CACHE_TYPE', 'simple')
     CACHE_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_DEFAULT_TIMEOUT', 300))
+    HEALTH_CHECK_CACHE_TIMEOUT = int(os.environ.get('HEALTH_CHECK_CACHE_TIMEOUT', 5))
+    HEALTH_CHECK_TIMEOUT = float(os.environ.get('HEALTH_CHECK_TIMEOUT', 3))  # Seconds /health waits on a probe before reporting unhealthy
 
 
 class DevelopmentConfig(Config):
@@ -121,6 +171,12 @@ class ProductionConfig(Config):
     LOG_LEVEL = 'INFO'
     LOG_TO_STDOUT = True
     RATELIMIT_DEFAULT = "500 per hour"
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        **Config.SQLALCHEMY_ENGINE_OPTIONS,
+        'pool_pre_ping': True,  # Detect connections dropped by the server before use
+        'pool_size': 20,
+        'max_overflow': 10
+    }
 
 
 class TestingConfig(Config):
@@ -145,23 +201,26 @@ def get_config():
 
 
 def validate_azure_openai_config(config):
-    """Validate Azure OpenAI configuration"""
-    required_fields = ['AZURE_OPENAI_ENDPOINT', 'AZURE_OPENAI_API_KEY']
-    missing_fields = []
-    
-    for field in required_fields:
-        value = getattr(config, field, None)
-        if not value or value.endswith('placeholder'):
-            missing_fields.append(field)
+    """Validate Azure OpenAI configuration (accepts a config object or a Flask config dict)"""
+    lookup = config.get if isinstance(config, dict) else lambda field: getattr(config, field, None)
+    missing_fields = [
+        field for field in ('AZURE_OPENAI_ENDPOINT', 'AZURE_OPENAI_API_KEY')
+        if not (value := lookup(field)) or (isinstance(value, str) and value.endswith('placeholder'))
+    ]
     
     return {
-        'valid': len(missing_fields) == 0,
+        'valid': not missing_fields,
         'missing_fields': missing_fields
     }
 
 
-def init_directories():
-    """Initialize required directories"""
+@lru_cache(maxsize=1)
+def ensure_dirs():
+    """Create required directories on first write (once per process)"""
+    # Read-only container filesystems pre-provision these instead
+    if os.environ.get('SKIP_DIR_INIT') == '1':
+        return
+    
     directories = [
         'uploads',
         'logs',
@@ -186,5 +245,5 @@ if __name__ == '__main__':
     else:
         print(f"⚠️  Missing Azure OpenAI fields: {validation['missing_fields']}")
     
-    init_directories()
+    ensure_dirs()
     print("✅ Required directories created")
\ No newline at end of file
@@ -1,5 +1,6 @@
 # backend/db_setup.py
 import os
+import re
 import sys
 from datetime import datetime
 from flask import Flask
@@ -8,25 +9,211 @@ from sqlalchemy import text
 # Add backend to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from config import get_config, init_directories
+from config import get_config, ensure_dirs
+from utils.database import configure_sqlite_engine
 from models import db, User, Project, Website, Page, ExtractionRule, Snippet, ScheduledJob, Export, AuditLog
 
 
+# Full-text search tables, their sync triggers and secondary indexes.
+# pages_fts and users_fts are external-content tables: they store only the index and
+# read column values from their source table by rowid, so column names must match it.
+# users_fts uses the trigram tokenizer so MATCH gives the same case-insensitive
+# substring match as the admin user search's LIKE '%term%'.
+SCHEMA_DDL = """
+BEGIN IMMEDIATE;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+    title,
+    extracted_text,
+    url,
+    content='pages',
+    content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS pages_fts_insert AFTER INSERT ON pages BEGIN
+    INSERT INTO pages_fts(rowid, title, extracted_text, url)
+    VALUES (new.id, new.title, new.extracted_text, new.url);
+END;
+
+CREATE TRIGGER IF NOT EXISTS pages_fts_delete AFTER DELETE ON pages BEGIN
+    INSERT INTO pages_fts(pages_fts, rowid, title, extracted_text, url)
+    VALUES ('delete', old.id, old.title, old.extracted_text, old.url);
+END;
+
+CREATE TRIGGER IF NOT EXISTS pages_fts_update AFTER UPDATE ON pages BEGIN
+    INSERT INTO pages_fts(pages_fts, rowid, title, extracted_text, url)
+    VALUES ('delete', old.id, old.title, old.extracted_text, old.url);
+    INSERT INTO pages_fts(rowid, title, extracted_text, url)
+    VALUES (new.id, new.title, new.extracted_text, new.url);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+    email,
+    first_name,
+    last_name,
+    content='users',
+    content_rowid='id',
+    tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+    INSERT INTO users_fts(rowid, email, first_name, last_name)
+    VALUES (new.id, new.email, new.first_name, new.last_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+    INSERT INTO users_fts(users_fts, rowid, email, first_name, last_name)
+    VALUES ('delete', old.id, old.email, old.first_name, old.last_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF email, first_name, last_name ON users BEGIN
+    INSERT INTO users_fts(users_fts, rowid, email, first_name, last_name)
+    VALUES ('delete', old.id, old.email, old.first_name, old.last_name);
+    INSERT INTO users_fts(rowid, email, first_name, last_name)
+    VALUES (new.id, new.email, new.first_name, new.last_name);
+END;
+
+-- Unique, so registration and email changes can rely on it instead of a pre-check
+CREATE UNIQUE INDEX IF NOT EXISTS uq_users_email ON users(email);
+DROP INDEX IF EXISTS idx_users_email;
+CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
+-- Emails are stored lowercased and matched with plain equality, so lower(email) is never probed
+DROP INDEX IF EXISTS idx_users_email_lower;
+CREATE INDEX IF NOT EXISTS idx_projects_owner ON projects(owner_id);
+-- SQLite sorts NULLs lowest, so DESC already puts never-updated websites last
+CREATE INDEX IF NOT EXISTS idx_websites_project_updated ON websites(project_id, updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_websites_active_updated ON websites(updated_at DESC) WHERE status = 'active';
+CREATE INDEX IF NOT EXISTS idx_pages_website ON pages(website_id);
+CREATE INDEX IF NOT EXISTS idx_pages_url ON pages(url);
+CREATE INDEX IF NOT EXISTS idx_snippets_page ON snippets(page_id);
+CREATE INDEX IF NOT EXISTS idx_snippets_status ON snippets(status);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_created_action ON audit_logs(created_at DESC, action);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_user_created ON audit_logs(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_action_created ON audit_logs(action, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_resource_created ON audit_logs(resource_type, created_at DESC);
+DROP INDEX IF EXISTS idx_audit_logs_created;
+DROP INDEX IF EXISTS idx_audit_logs_user;
+DROP INDEX IF EXISTS idx_websites_project;
+DROP INDEX IF EXISTS idx_websites_status_updated;
+
+COMMIT;
+"""
+
+# Drops the pre-external-content pages_fts table, which kept its own copy of page text
+DROP_LEGACY_FTS_SQL = """
+BEGIN IMMEDIATE;
+DROP TRIGGER IF EXISTS pages_fts_insert;
+DROP TRIGGER IF EXISTS pages_fts_delete;
+DROP TRIGGER IF EXISTS pages_fts_update;
+DROP TABLE IF EXISTS pages_fts;
+COMMIT;
+"""
+
+# Whole-word search across email and name, for multi-word user searches (PostgreSQL).
+# A plain nullable column kept up by a trigger, rather than a STORED generated column,
+# since adding the latter rewrites the whole users table under an ACCESS EXCLUSIVE lock.
+USERS_SEARCH_TSV_EXPR = (
+    "to_tsvector('simple', coalesce({0}email, '') || ' ' || "
+    "coalesce({0}first_name, '') || ' ' || coalesce({0}last_name, ''))"
+)
+POSTGRES_SEARCH_TSV_DDL = [
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS search_tsv tsvector",
+    "CREATE OR REPLACE FUNCTION users_search_tsv_update() RETURNS trigger AS $$ "
+    "BEGIN NEW.search_tsv := " + USERS_SEARCH_TSV_EXPR.format('NEW.') + "; RETURN NEW; END "
+    "$$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS users_search_tsv_trigger ON users",
+    "CREATE TRIGGER users_search_tsv_trigger BEFORE INSERT OR UPDATE OF email, first_name, last_name "
+    "ON users FOR EACH ROW EXECUTE FUNCTION users_search_tsv_update()",
+]
+# Databases set up before the trigger have search_tsv as a generated column, which stays as is
+POSTGRES_SEARCH_TSV_GENERATED_SQL = text(
+    "SELECT is_generated = 'ALWAYS' FROM information_schema.columns "
+    "WHERE table_schema = current_schema() AND table_name = 'users' AND column_name = 'search_tsv'"
+)
+# Existing users are filled in small batches, each its own short transaction
+SEARCH_TSV_BACKFILL_BATCH = 1000
+POSTGRES_SEARCH_TSV_BACKFILL_SQL = text(
+    "UPDATE users SET search_tsv = " + USERS_SEARCH_TSV_EXPR.format('') + " "
+    "WHERE id IN (SELECT id FROM users WHERE search_tsv IS NULL LIMIT :batch)"
+)
+
+# PostgreSQL indexes: trigram indexes serve the admin user search's '%term%' matches,
+# and the websites and audit_logs composites serve their filtered, newest-first listings.
+# Indexes are built CONCURRENTLY, so re-running setup on a live database takes no
+# lock that blocks writes for longer than a catalog update.
+POSTGRES_INDEX_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_email_trgm ON users USING gin (lower(email) gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_first_name_trgm ON users USING gin (lower(first_name) gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_last_name_trgm ON users USING gin (lower(last_name) gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_search_tsv ON users USING gin (search_tsv)",
+    # Unique, so signups rely on it instead of a pre-check; INCLUDE (id) lets
+    # email existence checks be answered from the index alone
+    "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_users_email ON users (email) INCLUDE (id)",
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_users_email_id",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pages_website ON pages (website_id)",
+    # NULLS LAST matches the job listings' order, which puts never-updated websites last
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_websites_project_updated_nl ON websites (project_id, updated_at DESC NULLS LAST)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_websites_active_updated_nl ON websites (updated_at DESC NULLS LAST) WHERE status = 'active'",
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_websites_project_updated",
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_websites_active_updated",
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_websites_status_updated",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_logs_created_action ON audit_logs (created_at DESC, action)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_logs_user_created ON audit_logs (user_id, created_at DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_logs_action_created ON audit_logs (action, created_at DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_logs_resource_created ON audit_logs (resource_type, created_at DESC)",
+]
+
+# Indexes setup manages; a cancelled CONCURRENTLY build leaves one INVALID, and
+# IF NOT EXISTS would then skip it forever, so invalid ones are dropped and rebuilt
+POSTGRES_MANAGED_INDEXES = [
+    re.search(r'IF NOT EXISTS (\w+)', statement).group(1)
+    for statement in POSTGRES_INDEX_DDL if statement.startswith(('CREATE INDEX', 'CREATE UNIQUE INDEX'))
+]
+POSTGRES_INVALID_INDEXES_SQL = text(
+    "SELECT c.relname FROM pg_index i "
+    "JOIN pg_class c ON c.oid = i.indexrelid "
+    "JOIN pg_namespace n ON n.oid = c.relnamespace "
+    "WHERE NOT i.indisvalid AND n.nspname = current_schema() AND c.relname = ANY(:names)"
+)
+
+# Fresh planner statistics so the new indexes are picked up straight away
+POSTGRES_ANALYZE_SQL = "ANALYZE users, websites, pages, audit_logs"
+
+# Full reindex of the FTS tables from their source tables (FTS5 'rebuild' command)
+REBUILD_PAGES_FTS_SQL = "INSERT INTO pages_fts(pages_fts) VALUES('rebuild');"
+REBUILD_USERS_FTS_SQL = "INSERT INTO users_fts(users_fts) VALUES('rebuild');"
+REBUILD_FTS_SQL = REBUILD_PAGES_FTS_SQL + "\n" + REBUILD_USERS_FTS_SQL
+
+
 def create_app():
     """Create Flask app for database operations"""
     app = Flask(__name__)
     config = get_config()()
     app.config.from_object(config)
     
-    # Initialize directories
-    init_directories()
-    
     # Initialize database
     db.init_app(app)
     
+    # Tune SQLite before create_tables opens the first connection
+    with app.app_context():
+        configure_sqlite_engine(db.engine)
+    
     return app
 
 
+def setup_users_search_tsv(conn):
+    """Add the users.search_tsv column and its trigger, then backfill it in batches"""
+    if conn.execute(POSTGRES_SEARCH_TSV_GENERATED_SQL).scalar():
+        return
+    
+    for statement in POSTGRES_SEARCH_TSV_DDL:
+        conn.execute(text(statement))
+    
+    while conn.execute(POSTGRES_SEARCH_TSV_BACKFILL_SQL, {'batch': SEARCH_TSV_BACKFILL_BATCH}).rowcount:
+        pass
+
+
 def create_tables(app):
     """Create all database tables"""
     with app.app_context():
@@ -34,51 +221,48 @@ def create_tables(app):
             # Create all tables
             db.create_all()
             
-            # Create FTS5 virtual table for full-text search
-            db.session.execute(text("""
-                CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
-                    page_id,
-                    title,
-                    content,
-                    url
-                );
-            """))
-            
-            # Create FTS5 triggers for automatic indexing
-            db.session.execute(text("""
-                CREATE TRIGGER IF NOT EXISTS pages_fts_insert AFTER INSERT ON pages BEGIN
-                    INSERT INTO pages_fts(page_id, title, content, url) 
-                    VALUES (new.id, new.title, new.extracted_text, new.url);
-                END;
-            """))
-            
-            db.session.execute(text("""
-                CREATE TRIGGER IF NOT EXISTS pages_fts_delete AFTER DELETE ON pages BEGIN
-                    DELETE FROM pages_fts WHERE page_id = old.id;
-                END;
-            """))
-            
-            db.session.execute(text("""
-                CREATE TRIGGER IF NOT EXISTS pages_fts_update AFTER UPDATE ON pages BEGIN
-                    DELETE FROM pages_fts WHERE page_id = old.id;
-                    INSERT INTO pages_fts(page_id, title, content, url) 
-                    VALUES (new.id, new.title, new.extracted_text, new.url);
-                END;
-            """))
-            
-            # Create indexes for better performance
-            db.session.execute(text("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);"))
-            db.session.execute(text("CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);"))
-            db.session.execute(text("CREATE INDEX IF NOT EXISTS idx_projects_owner ON projects(owner_id);"))
-            db.session.execute(text("CREATE INDEX IF NOT EXISTS idx_websites_project ON websites(project_id);"))
-            db.session.execute(text("CREATE INDEX IF NOT EXISTS idx_pages_website ON pages(website_id);"))
-            db.session.execute(text("CREATE INDEX IF NOT EXISTS idx_pages_url ON pages(url);"))
-            db.session.execute(text("CREATE INDEX IF NOT EXISTS idx_snippets_page ON snippets(page_id);"))
-            db.session.execute(text("CREATE INDEX IF NOT EXISTS idx_snippets_status ON snippets(status);"))
-            db.session.execute(text("CREATE INDEX IF NOT EXISTS idx_audit_logs_user ON audit_logs(user_id);"))
-            db.session.execute(text("CREATE INDEX IF NOT EXISTS idx_audit_logs_created ON audit_logs(created_at);"))
+            if db.engine.dialect.name == 'postgresql':
+                # CONCURRENTLY cannot run inside a transaction block
+                with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                    # Index builds on large tables outlast the app's per-connection statement_timeout
+                    conn.execute(text("SET statement_timeout = 0"))
+                    invalid = conn.execute(
+                        POSTGRES_INVALID_INDEXES_SQL, {'names': POSTGRES_MANAGED_INDEXES}
+                    ).scalars().all()
+                    for name in invalid:
+                        print(f"⚠️  Rebuilding invalid index {name}")
+                        conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+                    setup_users_search_tsv(conn)
+                    for statement in POSTGRES_INDEX_DDL:
+                        conn.execute(text(statement))
+                    conn.execute(text(POSTGRES_ANALYZE_SQL))
+                print("✅ Database tables created successfully")
+                return
             
+            # Existing pages must be indexed when pages_fts is new or still the legacy layout
+            fts_sql = db.session.execute(
+                text("SELECT sql FROM sqlite_master WHERE name = 'pages_fts'")
+            ).scalar()
+            needs_rebuild = fts_sql is None or "content='pages'" not in fts_sql
+            # Existing users must likewise be indexed when users_fts is new
+            users_fts_missing = db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = 'users_fts'")
+            ).scalar() is None
             db.session.commit()
+            
+            # Run the FTS5 tables, triggers and indexes as one script in a single transaction
+            raw_connection = db.engine.raw_connection()
+            try:
+                if fts_sql is not None and needs_rebuild:
+                    raw_connection.executescript(DROP_LEGACY_FTS_SQL)
+                raw_connection.executescript(SCHEMA_DDL)
+                if needs_rebuild:
+                    raw_connection.executescript(REBUILD_PAGES_FTS_SQL)
+                if users_fts_missing:
+                    raw_connection.executescript(REBUILD_USERS_FTS_SQL)
+            finally:
+                raw_connection.close()
+            
             print("✅ Database tables created successfully")
             
         except Exception as e:
@@ -87,6 +271,37 @@ def create_tables(app):
             raise
 
 
+def rebuild_fts(app):
+    """Rebuild the full-text search indexes from the pages and users tables"""
+    with app.app_context():
+        try:
+            raw_connection = db.engine.raw_connection()
+            try:
+                raw_connection.executescript(REBUILD_FTS_SQL)
+            finally:
+                raw_connection.close()
+            
+            print("✅ Full-text search indexes rebuilt")
+            
+        except Exception as e:
+            print(f"❌ Error rebuilding full-text search indexes: {e}")
+            raise
+
+
+def analyze_database(app):
+    """Refresh the planner statistics behind the admin dashboard's row count estimates"""
+    with app.app_context():
+        try:
+            db.session.execute(text("ANALYZE"))
+            db.session.commit()
+            print("✅ Database statistics refreshed")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error analyzing database: {e}")
+            raise
+
+
 def create_admin_user(app, email="admin@example.com", password="admin123", first_name="Admin", last_name="User"):
     """Create default admin user with proper role assignment"""
     with app.app_context():
@@ -199,7 +414,7 @@ def create_sample_data(app):
             project.set_tags(["demo", "technology", "web-scraping"])
             
             db.session.add(project)
-            db.session.flush()  # Get project ID
+            db.session.flush()  # Reserve project ID for the dependent rows
             
             # Create sample website
             website = Website(
@@ -215,9 +430,6 @@ def create_sample_data(app):
                 status="active"
             )
             
-            db.session.add(website)
-            db.session.flush()  # Get website ID
-            
             # Create sample extraction rule
             extraction_rule = ExtractionRule(
                 project_id=project.id,
@@ -233,7 +445,8 @@ def create_sample_data(app):
                 priority=100
             )
             
-            db.session.add(extraction_rule)
+            # Nothing references the website ID, so both rows go out with the commit
+            db.session.add_all([website, extraction_rule])
             db.session.commit()
             
             print("✅ Sample data created successfully")
@@ -248,8 +461,11 @@ def reset_database(app):
     """Drop and recreate all tables (WARNING: This deletes all data!)"""
     with app.app_context():
         try:
-            # Drop FTS table first
+            # Drop the FTS tables first; drop_all doesn't know them, and a users_fts left
+            # behind would keep old rowids and match the wrong users after the reset
             db.session.execute(text("DROP TABLE IF EXISTS pages_fts;"))
+            db.session.execute(text("DROP TABLE IF EXISTS users_fts;"))
+            db.session.commit()
             
             # Drop all tables
             db.drop_all()
@@ -269,6 +485,7 @@ def backup_database(app, backup_path=None):
     
     try:
         import shutil
+        ensure_dirs()
         db_path = app.config['SQLALCHEMY_DATABASE_URI'].replace('sqlite:///', '')
         
         if os.path.exists(db_path):
@@ -346,7 +563,7 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Database setup and management')
-    parser.add_argument('action', choices=['create', 'reset', 'backup', 'verify', 'admin', 'sample', 'fix-admin'], 
+    parser.add_argument('action', choices=['create', 'reset', 'backup', 'verify', 'admin', 'sample', 'fix-admin', 'rebuild-fts', 'analyze'], 
                        help='Action to perform')
     parser.add_argument('--email', default='admin@example.com', help='Admin email (for admin action)')
     parser.add_argument('--password', default='admin123', help='Admin password (for admin action)')
@@ -391,6 +608,12 @@ def main():
         fix_admin_roles(app)
         verify_database(app)
         
+    elif args.action == 'rebuild-fts':
+        rebuild_fts(app)
+        
+    elif args.action == 'analyze':
+        analyze_database(app)
+        
     print("🎉 Database setup completed")
 
 
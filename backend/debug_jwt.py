@@ -4,6 +4,7 @@ JWT Debug Script
 This script helps debug JWT token issues by testing token generation and validation.
 """
 
+import atexit
 import os
 import sys
 from datetime import datetime, timedelta
@@ -11,15 +12,30 @@ from datetime import datetime, timedelta
 # Add backend to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    print("⚠️  python-dotenv not available")
 
-from flask import Flask
-from flask_jwt_extended import JWTManager, create_access_token, decode_token
-from config import get_config
+_HTTP = None
+
+
+def get_http_session():
+    """Return a shared HTTP session so repeated checks reuse the connection"""
+    global _HTTP
+    if _HTTP is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        _HTTP = requests.Session()
+        _HTTP.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=0))
+        atexit.register(_HTTP.close)
+    return _HTTP
+
+
+def load_environment():
+    """Load .env once without overriding variables already set"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(override=False)
+    except ImportError:
+        print("⚠️  python-dotenv not available")
 
 
 def test_jwt_configuration():
@@ -27,6 +43,10 @@ def test_jwt_configuration():
     print("🔍 Testing JWT Configuration")
     print("=" * 40)
     
+    from flask import Flask
+    from flask_jwt_extended import JWTManager, create_access_token, decode_token
+    from config import get_config
+    
     # Create minimal Flask app
     app = Flask(__name__)
     config_class = get_config()
@@ -107,6 +127,8 @@ def test_config_consistency():
     print("\n⚖️  Testing Configuration Consistency")
     print("=" * 40)
     
+    from config import get_config
+    
     config_class = get_config()
     config = config_class()
     
@@ -170,7 +192,7 @@ def test_backend_connectivity():
         import requests
         
         # Test health endpoint
-        response = requests.get('http://localhost:5232/health', timeout=5)
+        response = get_http_session().get('http://localhost:5232/health', timeout=5)
         if response.status_code == 200:
             print("   ✅ Backend server is running")
             health_data = response.json()
@@ -195,6 +217,8 @@ def main():
     print("🔧 JWT Configuration Debug Tool")
     print("=" * 50)
     
+    load_environment()
+    
     success = True
     
     # Test environment variables
@@ -1,5 +1,7 @@
 # backend/routes/__init__.py
+import importlib
 from flask import Blueprint
+from utils.auth import attach_auth
 
 # Create blueprints
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
@@ -10,17 +12,50 @@ content_bp = Blueprint('content', __name__, url_prefix='/api/content')
 reports_bp = Blueprint('reports', __name__, url_prefix='/api/reports')
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
-# Import route handlers
-from . import auth_routes, project_routes, website_routes, scraping_routes, content_routes, report_routes, admin_routes
+# Blueprint registry: (name, route handler module, blueprint)
+_BLUEPRINTS = [
+    ('auth', '.auth_routes', auth_bp),
+    ('projects', '.project_routes', projects_bp),
+    ('websites', '.website_routes', websites_bp),
+    ('scraping', '.scraping_routes', scraping_bp),
+    ('content', '.content_routes', content_bp),
+    ('reports', '.report_routes', reports_bp),
+    ('admin', '.admin_routes', admin_bp),
+]
+
+ALL_BLUEPRINTS = tuple(name for name, _, _ in _BLUEPRINTS)
+
+
+# JWT is wired up by whichever blueprint is registered first
+def init_auth(state):
+    attach_auth(state.app)
+
+
+for _, _, blueprint in _BLUEPRINTS:
+    blueprint.record_once(init_auth)
+
 
 def register_blueprints(app):
-    """Register all blueprints with the Flask app"""
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(projects_bp)
-    app.register_blueprint(websites_bp)
-    app.register_blueprint(scraping_bp)
-    app.register_blueprint(content_bp)
-    app.register_blueprint(reports_bp)
-    app.register_blueprint(admin_bp)
+    """Register enabled blueprints, importing only their route modules"""
+    enabled = app.config.get('ENABLED_BLUEPRINTS') or ALL_BLUEPRINTS
+    
+    for name, module, blueprint in _BLUEPRINTS:
+        if name in enabled:
+            importlib.import_module(module, package=__name__)
+            app.register_blueprint(blueprint)
+    
+    _check_duplicate_rules(app)
 
 
+def _check_duplicate_rules(app):
+    """Fail at startup if two endpoints claim the same URL rule and method
+    
+    Flask only rejects duplicate endpoint names; a second handler for the same URL
+    would otherwise be registered and silently never reached.
+    """
+    seen = {}
+    for rule in app.url_map.iter_rules():
+        for method in rule.methods - {'HEAD', 'OPTIONS'}:
+            other = seen.setdefault((rule.rule, method), rule.endpoint)
+            if other != rule.endpoint:
+                raise RuntimeError(f"{method} {rule.rule} is routed to both {other} and {rule.endpoint}")
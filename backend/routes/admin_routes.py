@@ -1,71 +1,185 @@
 # backend/routes/admin_routes.py
-from flask import request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import text
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import request, current_app, g, stream_with_context
+from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from sqlalchemy import bindparam, column, func, select, text
 from . import admin_bp
-from services.auth_service import AuthService, AuditService
+from services import audit_queue
+from services.auth_service import AuditService
+from services.user_cache import get_user_view
+from services.azure_openai_service import get_azure_openai_service
 from models import db, User
+from utils.cache import TTLStore
 from utils.decorators import admin_required
+from utils.json import ojsonify
+from utils.pagination import cursor_pagination, keyset_page, split_page
+from utils.responses import conditional_response
+
+# All blocked patterns matched in one case-insensitive pass over the query, on word
+# boundaries so identifiers that merely contain a keyword don't trip it
+_DANGEROUS_SQL_RE = re.compile(r'\bdrop\s+database\b|\bformat\s+c:|\brm\s+-rf\b|\bdel\s+/', re.IGNORECASE)
+# String literals and comments never execute, so they are blanked before the check
+_SQL_NON_CODE_RE = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/", re.DOTALL)
+# Data-modifying keywords; row locking clauses match the first alternative and are skipped
+_SQL_WRITE_RE = re.compile(r'\bfor\s+(?:no\s+key\s+)?update\b|\b(insert|update|delete|merge)\b', re.IGNORECASE)
+
+# Shorter user searches match as a prefix only
+MIN_SUBSTRING_SEARCH = 3
+
+# Trigram FTS lookup of matching user ids (SQLite); a quoted term matches as a substring
+_USERS_FTS_QUERY = text(
+    "SELECT rowid FROM users_fts WHERE users_fts MATCH :term"
+).columns(column('rowid'))
+
+# Whole-word match on the generated search_tsv column (PostgreSQL), used when a search spans columns
+_USERS_TSV_MATCH = text("users.search_tsv @@ plainto_tsquery('simple', :q)")
+
+# Columns shown in the admin user list, read as plain rows instead of ORM objects
+_USER_LIST_COLS = (
+    User.id, User.email, User.first_name, User.last_name, User.role,
+    User.is_active, User.created_at, User.last_login
+)
+_USER_KEYS = tuple(col.key for col in _USER_LIST_COLS)
+
+# Paged SQL executor results; the total row count rides along in this column
+SQL_PAGE_SIZE = 100
+SQL_MAX_PAGE_SIZE = 1000
+_TOTAL_COLUMN = '__total'
+
+# Past this many estimated rows an exact count costs more than the page itself (PostgreSQL)
+ESTIMATED_COUNT_THRESHOLD = 10000
+PLAN_ESTIMATE_TTL = 60  # seconds
+_PLAN_ESTIMATES = TTLStore()
+
+# SELECT results are streamed in batches and capped to protect the worker
+STREAM_BATCH_SIZE = 1000
+STREAM_MAX_ROWS = 100000
+
+
+@admin_bp.before_request
+def load_current_user():
+    """Decode the JWT once per admin request, loading the user only for tokens without a role claim"""
+    # CORS preflight requests carry no token
+    if request.method == 'OPTIONS':
+        return None
+    
+    verify_jwt_in_request()
+    g.jwt_claims = get_jwt()
+    g.user_id = int(g.jwt_claims['sub'])
+    if 'role' not in g.jwt_claims:
+        g.current_user = get_user_view(g.user_id)
 
 
 @admin_bp.route('/users', methods=['GET'])
-@jwt_required()
 @admin_required
 def get_users():
     """Get all users"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 50, type=int)
-        search = request.args.get('search')
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 50, type=int), 1), 100)
+        search = (request.args.get('search') or '').strip()
+        cursor = request.args.get('cursor')
+        # The total only changes the first page's answer; later pages reuse the client's copy
+        include_count = page == 1 or request.args.get('count', 'false') == 'true'
         
-        query = User.query
+        stmt = select(*_USER_LIST_COLS)
+        count_stmt = select(func.count()).select_from(User)
         
         if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                db.or_(
-                    User.email.ilike(search_term),
-                    User.first_name.ilike(search_term),
-                    User.last_name.ilike(search_term)
+            # One or two characters would match most of the table anyway, so those only
+            # match as a prefix. Longer terms use substring matching, served by the trigram
+            # users_fts table on SQLite and by the trigram indexes on PostgreSQL.
+            search = search.lower()
+            words = search.split()
+            dialect = db.engine.dialect.name
+            if dialect == 'sqlite' and all(len(word) >= MIN_SUBSTRING_SEARCH for word in words):
+                # Each word must appear somewhere in the email or name, so full names match
+                fts_term = ' '.join('"' + word.replace('"', '""') + '"' for word in words)
+                condition = User.id.in_(_USERS_FTS_QUERY.bindparams(term=fts_term))
+            elif dialect == 'postgresql' and len(words) > 1:
+                # A full name spans columns, which the per-column trigram indexes cannot match
+                condition = _USERS_TSV_MATCH.bindparams(q=search)
+            else:
+                # Same lower(...) expressions as the user indexes
+                search_term = f"{search}%" if len(search) < MIN_SUBSTRING_SEARCH else f"%{search}%"
+                condition = db.or_(
+                    func.lower(User.email).like(search_term),
+                    func.lower(User.first_name).like(search_term),
+                    func.lower(User.last_name).like(search_term)
                 )
+            stmt = stmt.where(condition)
+            count_stmt = count_stmt.where(condition)
+        
+        # Cursor requests seek past the last row seen instead of counting and offsetting
+        if cursor is not None:
+            rows, next_cursor = split_page(
+                db.session.execute(keyset_page(stmt, User, cursor, per_page)).all(), per_page
             )
+            return conditional_response(ojsonify({
+                'success': True,
+                'users': [_user_row_to_dict(row) for row in rows],
+                'pagination': cursor_pagination(per_page, cursor, next_cursor)
+            }))
         
-        pagination = query.paginate(
-            page=page, per_page=min(per_page, 100), error_out=False
-        )
+        # One extra row tells us whether a next page exists without counting
+        rows = db.session.execute(
+            stmt.order_by(User.id).offset((page - 1) * per_page).limit(per_page + 1)
+        ).all()
+        has_next = len(rows) > per_page
+        users = [_user_row_to_dict(row) for row in rows[:per_page]]
         
-        return jsonify({
+        total = db.session.execute(count_stmt).scalar() if include_count else None
+        
+        return conditional_response(ojsonify({
             'success': True,
-            'users': [user.to_dict() for user in pagination.items],
+            'users': users,
             'pagination': {
-                'page': pagination.page,
-                'pages': pagination.pages,
-                'per_page': pagination.per_page,
-                'total': pagination.total,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
+                'page': page,
+                'pages': (total + per_page - 1) // per_page if include_count else None,
+                'per_page': per_page,
+                'total': total,
+                'has_next': has_next,
+                'has_prev': page > 1
             }
-        }), 200
+        }))
     
+    except ValueError:
+        return ojsonify({
+            'success': False,
+            'message': 'Invalid cursor'
+        }), 400
     except Exception as e:
         current_app.logger.error(f"Get users error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve users'
         }), 500
 
 
+def _user_row_to_dict(row):
+    """Build the user list entry from a projected row"""
+    user = dict(zip(_USER_KEYS, row))
+    user['full_name'] = f"{user['first_name']} {user['last_name']}"
+    for key in ('created_at', 'last_login'):
+        if user[key]:
+            user[key] = user[key].isoformat()
+    return user
+
+
 @admin_bp.route('/sql/execute', methods=['POST'])
-@jwt_required()
 @admin_required
 def execute_sql():
     """Execute raw SQL query - FIXED VERSION"""
     try:
-        user_id = get_jwt_identity()
-        data = request.get_json()
+        user_id = g.user_id
+        data = request.get_json(silent=True)
         
         if not data or not data.get('sql'):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'SQL query is required'
             }), 400
@@ -73,38 +187,57 @@ def execute_sql():
         sql_query = data['sql'].strip()
         
         if not sql_query:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'SQL query cannot be empty'
             }), 400
         
         # Basic validation - reject dangerous operations in certain contexts
-        dangerous_patterns = ['drop database', 'format c:', 'rm -rf', 'del /']
-        sql_lower = sql_query.lower()
+        if _DANGEROUS_SQL_RE.search(_SQL_NON_CODE_RE.sub(' ', sql_query)):
+            return ojsonify({
+                'success': False,
+                'message': 'Query contains potentially dangerous operations'
+            }), 400
         
-        for pattern in dangerous_patterns:
-            if pattern in sql_lower:
-                return jsonify({
-                    'success': False,
-                    'message': 'Query contains potentially dangerous operations'
-                }), 400
+        # Query type depends on the leading keyword; WITH opens a SELECT's CTEs unless
+        # one of them writes, and then it has to run on the committing path
+        sql_lower = sql_query[:10].lower()
+        is_select = sql_lower.startswith('select') or (
+            sql_lower.startswith('with') and not _is_writing_sql(sql_query)
+        )
+        
+        # SELECT rows go out as objects keyed by column, or as bare arrays on request
+        row_format = data.get('row_format', 'object')
+        
+        # Optional paging over SELECT results
+        try:
+            page = max(int(data['page']), 1) if data.get('page') else None
+            per_page = min(max(int(data.get('per_page', SQL_PAGE_SIZE)), 1), SQL_MAX_PAGE_SIZE)
+        except (TypeError, ValueError):
+            return ojsonify({
+                'success': False,
+                'message': 'page and per_page must be integers'
+            }), 400
         
         try:
+            if page and is_select:
+                return _paginated_select(user_id, sql_query, page, per_page, row_format)
+            
+            # SELECT rows are encoded straight from each fetched row, never held as a list of dicts
+            if is_select:
+                return _stream_select(user_id, sql_query, row_format)
+            
             # **FIX: Wrap SQL in text() for SQLAlchemy 2.0+ compatibility**
             result = db.session.execute(text(sql_query))
             
             # Handle different types of queries
-            if sql_lower.startswith(('select', 'show', 'describe', 'explain')):
-                # For SELECT queries, fetch results
-                rows = result.fetchall()
-                
-                # Convert rows to dictionaries if they have column names
-                if rows and hasattr(result, 'keys'):
-                    columns = list(result.keys())
-                    data_rows = [dict(zip(columns, row)) for row in rows]
+            if sql_lower.startswith(('show', 'describe', 'explain')):
+                # Small row-returning statements, paired with the column names once, in C
+                columns = tuple(result.keys())
+                if row_format == 'array':
+                    data_rows = [tuple(row) for row in result]
                 else:
-                    data_rows = [list(row) for row in rows] if rows else []
-                    columns = [f"column_{i}" for i in range(len(data_rows[0]))] if data_rows else []
+                    data_rows = [dict(zip(columns, row)) for row in result]
                 
                 response_data = {
                     'success': True,
@@ -117,7 +250,7 @@ def execute_sql():
             else:
                 # For INSERT, UPDATE, DELETE, CREATE, etc.
                 db.session.commit()
-                rowcount = result.rowcount if hasattr(result, 'rowcount') else 0
+                rowcount = result.rowcount
                 
                 response_data = {
                     'success': True,
@@ -127,24 +260,24 @@ def execute_sql():
                 }
             
             # Log the SQL execution
-            AuditService.log_action(
+            audit_queue.enqueue(
                 user_id=user_id,
                 action='execute_sql',
                 details={
-                    'query_type': 'SELECT' if sql_lower.startswith('select') else 'MODIFY',
+                    'query_type': response_data['query_type'],
                     'query_length': len(sql_query),
                     'success': True
                 }
             )
             
-            return jsonify(response_data), 200
+            return ojsonify(response_data), 200
             
         except Exception as sql_error:
             db.session.rollback()
             current_app.logger.error(f"SQL execution error: {sql_error}")
             
             # Log the failed execution
-            AuditService.log_action(
+            audit_queue.enqueue(
                 user_id=user_id,
                 action='execute_sql',
                 details={
@@ -154,7 +287,7 @@ def execute_sql():
                 }
             )
             
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': f'SQL execution failed: {str(sql_error)}',
                 'error_type': type(sql_error).__name__
@@ -162,14 +295,172 @@ def execute_sql():
     
     except Exception as e:
         current_app.logger.error(f"Execute SQL error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to execute SQL query'
         }), 500
 
 
+def _paginated_select(user_id, sql_query, page, per_page, row_format):
+    """Execute one page of a SELECT, counting the full result in the same pass
+    
+    Results the planner expects to be large report its row estimate as the total instead.
+    """
+    offset = (page - 1) * per_page
+    inner_query = sql_query.rstrip().rstrip(';')
+    estimate = _estimated_row_count(inner_query)
+    estimated = estimate is not None and estimate > ESTIMATED_COUNT_THRESHOLD
+    
+    # COUNT(*) OVER () is computed before LIMIT/OFFSET apply, so every row carries the
+    # total and the user's query runs once instead of once more for a COUNT subquery.
+    # LIMIT/OFFSET are bound, not interpolated, so every page of a query shares one
+    # statement text and reuses its compiled form and any server-side prepared plan.
+    if estimated:
+        paged_sql = f"SELECT sub.* FROM ({inner_query}) sub LIMIT :limit OFFSET :offset"
+    else:
+        paged_sql = (
+            f"SELECT sub.*, COUNT(*) OVER () AS {_TOTAL_COLUMN} "
+            f"FROM ({inner_query}) sub LIMIT :limit OFFSET :offset"
+        )
+    paged_query = text(paged_sql).execution_options(stream_results=True, yield_per=STREAM_BATCH_SIZE)
+    result = db.session.execute(paged_query, {'limit': per_page, 'offset': offset})
+    
+    # The exact total is always the last column
+    columns = tuple(result.keys()) if estimated else tuple(result.keys())[:-1]
+    state = {'total': None}
+    
+    def rows():
+        if estimated:
+            yield from result
+            return
+        for row in result:
+            state['total'] = row[-1]
+            yield row[:-1]
+    
+    def summary(row_count):
+        if estimated:
+            total_rows = estimate
+            has_next = row_count == per_page
+        else:
+            total_rows = state['total']
+            if not row_count:
+                # Past the last page the total is unknown without another query
+                total_rows = 0 if offset == 0 else None
+            has_next = total_rows is not None and offset + row_count < total_rows
+        return {
+            'row_count': row_count,
+            'pagination': {
+                'page': page,
+                'pages': (total_rows + per_page - 1) // per_page if total_rows is not None else None,
+                'per_page': per_page,
+                'total': total_rows,
+                'estimated': estimated,
+                'has_next': has_next,
+                'has_prev': page > 1
+            },
+            'message': f'Query executed successfully. {row_count} rows returned.'
+        }
+    
+    _audit_select(user_id, sql_query, estimated_total=estimated)
+    return _stream_rows(result, columns, rows(), row_format, summary)
+
+
+def _is_writing_sql(sql_query):
+    """Whether a statement contains INSERT, UPDATE, DELETE or MERGE outside literals and comments"""
+    code = _SQL_NON_CODE_RE.sub(' ', sql_query)
+    return any(match.group(1) for match in _SQL_WRITE_RE.finditer(code))
+
+
+def _estimated_row_count(sql_query):
+    """Planner row estimate for a SELECT on PostgreSQL, cached per query text; None elsewhere"""
+    if db.engine.dialect.name != 'postgresql':
+        return None
+    
+    # Paging through the same query plans it once
+    key = hashlib.blake2b(sql_query.encode('utf-8'), digest_size=16).digest()
+    estimate = _PLAN_ESTIMATES.get(key, PLAN_ESTIMATE_TTL)
+    if estimate is None:
+        plan = db.session.execute(text(f"EXPLAIN (FORMAT JSON) {sql_query}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        _PLAN_ESTIMATES.set(key, estimate)
+    return estimate
+
+
+def _stream_select(user_id, sql_query, row_format):
+    """Execute a SELECT and stream its rows as they are fetched, up to STREAM_MAX_ROWS"""
+    result = db.session.execute(
+        text(sql_query).execution_options(stream_results=True, yield_per=STREAM_BATCH_SIZE)
+    )
+    columns = tuple(result.keys())
+    state = {'truncated': False}
+    
+    def rows():
+        for row_count, row in enumerate(result):
+            if row_count == STREAM_MAX_ROWS:
+                state['truncated'] = True
+                break
+            yield row
+    
+    def summary(row_count):
+        message = f'Query executed successfully. {row_count} rows returned.'
+        if state['truncated']:
+            message += f' Results truncated to {STREAM_MAX_ROWS} rows.'
+        return {
+            'row_count': row_count,
+            'truncated': state['truncated'],
+            'message': message
+        }
+    
+    _audit_select(user_id, sql_query, streamed=True)
+    return _stream_rows(result, columns, rows(), row_format, summary)
+
+
+def _audit_select(user_id, sql_query, **details):
+    audit_queue.enqueue(
+        user_id=user_id,
+        action='execute_sql',
+        details={
+            'query_type': 'SELECT',
+            'query_length': len(sql_query),
+            'success': True,
+            **details
+        }
+    )
+
+
+def _stream_rows(result, columns, rows, row_format, summary):
+    """Stream a SELECT response, encoding each row as it is fetched
+    
+    Rows are objects keyed by column by default; row_format 'array' sends bare value
+    arrays alongside the shared columns list. Fields only known once every row has been
+    read (row count, totals) come from summary(row_count) after the data array.
+    """
+    dumps = current_app.json.dumps_bytes
+    
+    def encode(values):
+        if row_format == 'array':
+            return dumps(values)
+        return dumps(dict(zip(columns, values)))
+    
+    def generate():
+        row_count = 0
+        try:
+            yield b'{"success":true,"query_type":"SELECT","columns":' + dumps(columns) + b',"data":['
+            for values in rows:
+                yield (b',' if row_count else b'') + encode(tuple(values))
+                row_count += 1
+        finally:
+            result.close()
+        
+        # Splice the summary object's members onto the open response object
+        yield b'],' + dumps(summary(row_count))[1:] + b'\n'
+    
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+
 @admin_bp.route('/audit-logs', methods=['GET'])
-@jwt_required()
 @admin_required
 def get_audit_logs():
     """Get audit logs"""
@@ -185,92 +476,190 @@ def get_audit_logs():
             action=action,
             resource_type=resource_type,
             page=page,
-            per_page=min(per_page, 200)
+            per_page=min(per_page, 200),
+            cursor=request.args.get('cursor')
         )
         
-        return jsonify(result), 200
+        if not result['success']:
+            return ojsonify(result), 500
+        
+        return conditional_response(ojsonify(result))
     
+    except ValueError:
+        return ojsonify({
+            'success': False,
+            'message': 'Invalid cursor'
+        }), 400
     except Exception as e:
         current_app.logger.error(f"Get audit logs error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve audit logs'
         }), 500
 
 
+_STATUS_CACHE = TTLStore()
+
+
+def _load_ai_status():
+    """Azure OpenAI service status"""
+    return get_azure_openai_service().get_service_status()
+
+
+def _config_settings():
+    """Settings read from app config, built once per app since config is fixed after startup"""
+    sections = current_app.extensions.get('admin_config_settings')
+    if sections is None:
+        config = current_app.config
+        sections = current_app.extensions['admin_config_settings'] = {
+            'database': {
+                'uri': config.get('SQLALCHEMY_DATABASE_URI', '').replace('///', '').split('/')[-1],
+                'echo': config.get('SQLALCHEMY_ECHO', False)
+            },
+            'app': {
+                'name': config.get('APP_NAME'),
+                'version': config.get('APP_VERSION'),
+                'debug': config.get('DEBUG'),
+                'flask_port': config.get('FLASK_PORT'),
+                'react_port': config.get('REACT_PORT')
+            }
+        }
+    return sections
+
+
 @admin_bp.route('/settings', methods=['GET'])
-@jwt_required()
 @admin_required
 def get_settings():
     """Get system settings"""
     try:
-        # Get Azure OpenAI service status
-        from services.azure_openai_service import get_azure_openai_service
-        ai_service = get_azure_openai_service()
-        
         settings = {
-            'azure_openai': ai_service.get_service_status(),
-            'database': {
-                'uri': current_app.config.get('SQLALCHEMY_DATABASE_URI', '').replace('///', '').split('/')[-1],
-                'echo': current_app.config.get('SQLALCHEMY_ECHO', False)
-            },
-            'app': {
-                'name': current_app.config.get('APP_NAME'),
-                'version': current_app.config.get('APP_VERSION'),
-                'debug': current_app.config.get('DEBUG'),
-                'flask_port': current_app.config.get('FLASK_PORT'),
-                'react_port': current_app.config.get('REACT_PORT')
-            }
+            'azure_openai': _STATUS_CACHE.get_or_set('ai_status', 30, _load_ai_status),
+            **_config_settings()
         }
         
-        return jsonify({
+        return conditional_response(ojsonify({
             'success': True,
             'settings': settings
-        }), 200
+        }))
     
     except Exception as e:
         current_app.logger.error(f"Get settings error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve settings'
         }), 500
 
 
+_STATUS_TABLES = ('users', 'projects', 'websites', 'pages', 'snippets')
+
+# Loads a status query on a second connection while the request thread runs the other
+_STATUS_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='admin-status')
+
+# Status queries are built once so every poll reuses the same statement objects
+_TABLE_ESTIMATES_QUERY = text("""
+    SELECT relname, reltuples::bigint FROM pg_class
+    WHERE relname IN :tables AND relkind = 'r'
+""").bindparams(bindparam('tables', expanding=True))
+
+# sqlite_stat1 holds one row per index; the first number in stat is the table's row count
+_SQLITE_STAT_EXISTS_QUERY = text("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+_SQLITE_STAT_QUERY = text("""
+    SELECT tbl, stat FROM sqlite_stat1
+    WHERE tbl IN :tables
+""").bindparams(bindparam('tables', expanding=True))
+
+_TABLE_STATS_QUERY = text("""
+    SELECT 
+        'users' as table_name, COUNT(*) as count FROM users
+    UNION ALL
+    SELECT 'projects', COUNT(*) FROM projects
+    UNION ALL
+    SELECT 'websites', COUNT(*) FROM websites
+    UNION ALL
+    SELECT 'pages', COUNT(*) FROM pages
+    UNION ALL
+    SELECT 'snippets', COUNT(*) FROM snippets
+""")
+
+# Bound cutoff keeps the statement text constant and portable across databases;
+# the range scan is served by idx_audit_logs_created_action
+_RECENT_ACTIVITY_QUERY = text("""
+    SELECT action, COUNT(*) as count 
+    FROM audit_logs 
+    WHERE created_at >= :cutoff
+    GROUP BY action
+    ORDER BY count DESC
+    LIMIT 10
+""").bindparams(bindparam('cutoff', type_=db.DateTime))
+
+
+def _load_table_estimates():
+    """Row counts from the database's statistics catalog, as of the last ANALYZE"""
+    dialect = db.engine.dialect.name
+    tables = {'tables': list(_STATUS_TABLES)}
+    
+    if dialect == 'postgresql':
+        # reltuples is -1 until a table has been vacuumed/analyzed
+        return dict(db.session.execute(_TABLE_ESTIMATES_QUERY, tables).tuples())
+    
+    if dialect == 'sqlite' and db.session.execute(_SQLITE_STAT_EXISTS_QUERY).scalar():
+        estimates = {}
+        for table, stat in db.session.execute(_SQLITE_STAT_QUERY, tables).tuples():
+            estimates[table] = max(estimates.get(table, 0), int(stat.split()[0]))
+        return estimates
+    
+    return {}
+
+
+def _load_table_stats(exact=False):
+    """Row counts per table - catalog estimates when every table has one, exact counts otherwise"""
+    if not exact:
+        estimates = _load_table_estimates()
+        if all(estimates.get(table, -1) >= 0 for table in _STATUS_TABLES):
+            return {table: estimates[table] for table in _STATUS_TABLES}
+    
+    return dict(db.session.execute(_TABLE_STATS_QUERY).tuples())
+
+
+def _load_recent_activity():
+    """Audit actions in the last 24 hours, most frequent first"""
+    cutoff = datetime.utcnow() - timedelta(hours=24)
+    return [
+        {'action': action, 'count': count}
+        for action, count in db.session.execute(_RECENT_ACTIVITY_QUERY, {'cutoff': cutoff}).tuples()
+    ]
+
+
+def _load_in_app_context(app, loader):
+    """Run a loader on a worker thread, with its own app context and so its own session"""
+    with app.app_context():
+        return loader()
+
+
 @admin_bp.route('/system/status', methods=['GET'])
-@jwt_required()
 @admin_required
 def get_system_status():
     """Get system status"""
     try:
-        # Get database statistics
-        stats_query = text("""
-            SELECT 
-                'users' as table_name, COUNT(*) as count FROM users
-            UNION ALL
-            SELECT 'projects', COUNT(*) FROM projects
-            UNION ALL
-            SELECT 'websites', COUNT(*) FROM websites
-            UNION ALL
-            SELECT 'pages', COUNT(*) FROM pages
-            UNION ALL
-            SELECT 'snippets', COUNT(*) FROM snippets
-        """)
+        # Counts come from catalog estimates unless ?exact=1 asks for full COUNT(*) scans;
+        # either way dashboards polling this share a cached result
+        exact = request.args.get('exact') == '1'
+        stats_key = 'table_stats_exact' if exact else 'table_stats'
+        table_stats = _STATUS_CACHE.get(stats_key, 30)
+        recent_activity = _STATUS_CACHE.get('recent_activity', 60)
         
-        stats_result = db.session.execute(stats_query).fetchall()
-        table_stats = {row[0]: row[1] for row in stats_result}
-        
-        # Check recent activity
-        recent_activity_query = text("""
-            SELECT action, COUNT(*) as count 
-            FROM audit_logs 
-            WHERE created_at >= datetime('now', '-24 hours')
-            GROUP BY action
-            ORDER BY count DESC
-            LIMIT 10
-        """)
-        
-        activity_result = db.session.execute(recent_activity_query).fetchall()
-        recent_activity = [{'action': row[0], 'count': row[1]} for row in activity_result]
+        # When both are stale, their queries overlap instead of running back to back
+        pending_activity = None
+        if table_stats is None and recent_activity is None:
+            pending_activity = _STATUS_EXECUTOR.submit(
+                _load_in_app_context, current_app._get_current_object(), _load_recent_activity
+            )
+        if table_stats is None:
+            table_stats = _load_table_stats(exact=exact)
+            _STATUS_CACHE.set(stats_key, table_stats)
+        if recent_activity is None:
+            recent_activity = pending_activity.result() if pending_activity else _load_recent_activity()
+            _STATUS_CACHE.set('recent_activity', recent_activity)
         
         status = {
             'table_statistics': table_stats,
@@ -282,14 +671,14 @@ def get_system_status():
             }
         }
         
-        return jsonify({
+        return conditional_response(ojsonify({
             'success': True,
             'status': status
-        }), 200
+        }))
     
     except Exception as e:
         current_app.logger.error(f"Get system status error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve system status'
         }), 500
\ No newline at end of file
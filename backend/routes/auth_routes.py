@@ -1,20 +1,37 @@
 # backend/routes/auth_routes.py
-from flask import request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask import request, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_limiter.util import get_remote_address
 from . import auth_bp
 from services.auth_service import AuthService, AuditService
-from utils.validators import validate_email, validate_password
+from services.user_cache import get_user_profile
+from utils.validators import normalize_email, validate_email, validate_password
+from utils.json import ojsonify
+from utils.rate_limit import route_limit
+from utils.responses import conditional_response
 
 
+def _login_account_key():
+    """Rate limit key for the account a login attempt targets"""
+    data = request.get_json(silent=True)
+    email = data.get('email') if isinstance(data, dict) else None
+    if isinstance(email, str) and email.strip():
+        return normalize_email(email)
+    return get_remote_address()
+
+
+# Attempts over either limit are rejected before any password hash is checked
 @auth_bp.route('/login', methods=['POST'])
+@route_limit(lambda: current_app.config['RATELIMIT_LOGIN'])
+@route_limit(lambda: current_app.config['RATELIMIT_LOGIN_ACCOUNT'], key_func=_login_account_key)
 def login():
     """User login endpoint"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         # Validate input
         if not data or not data.get('email') or not data.get('password'):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Email and password are required'
             }), 400
@@ -24,7 +41,7 @@ def login():
         
         # Validate email format
         if not validate_email(email):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Invalid email format'
             }), 400
@@ -41,7 +58,7 @@ def login():
                 user_agent=request.headers.get('User-Agent')
             )
             
-            return jsonify(result), 200
+            return ojsonify(result), 200
         else:
             # Log failed login attempt
             AuditService.log_action(
@@ -52,11 +69,11 @@ def login():
                 user_agent=request.headers.get('User-Agent')
             )
             
-            return jsonify(result), 401
+            return ojsonify(result), 401
     
     except Exception as e:
         current_app.logger.error(f"Login error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Login failed'
         }), 500
@@ -66,12 +83,12 @@ def login():
 def register():
     """User registration endpoint"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         # Validate input
         required_fields = ['email', 'password', 'first_name', 'last_name']
         if not data or not all(data.get(field) for field in required_fields):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'All fields are required'
             }), 400
@@ -82,16 +99,15 @@ def register():
         last_name = data['last_name'].strip()
         
         # Validate email format
-        print(f"Validating email: {email}")
         if not validate_email(email):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Invalid email format'
             }), 400
         
         # Validate password strength
         if not validate_password(password):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Password must be at least 8 characters long'
             }), 400
@@ -108,13 +124,13 @@ def register():
                 user_agent=request.headers.get('User-Agent')
             )
             
-            return jsonify(result), 201
+            return ojsonify(result), 201
         else:
-            return jsonify(result), 400
+            return ojsonify(result), 400
     
     except Exception as e:
         current_app.logger.error(f"Registration error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Registration failed'
         }), 500
@@ -125,17 +141,17 @@ def register():
 def refresh():
     """Refresh access token"""
     try:
-        refresh_token = get_jwt()
-        result = AuthService.refresh_access_token(refresh_token)
+        # jwt_required has already verified the refresh token (through the decode cache)
+        result = AuthService.refresh_access_token(get_jwt_identity())
         
         if result['success']:
-            return jsonify(result), 200
+            return ojsonify(result), 200
         else:
-            return jsonify(result), 401
+            return ojsonify(result), 401
     
     except Exception as e:
         current_app.logger.error(f"Token refresh error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Token refresh failed'
         }), 500
@@ -158,14 +174,14 @@ def logout():
         
         # TODO: Add token to blacklist
         
-        return jsonify({
+        return ojsonify({
             'success': True,
             'message': 'Logged out successfully'
         }), 200
     
     except Exception as e:
         current_app.logger.error(f"Logout error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Logout failed'
         }), 500
@@ -177,22 +193,22 @@ def get_profile():
     """Get user profile"""
     try:
         user_id = get_jwt_identity()
-        user = AuthService.get_user_by_id(user_id)
+        profile = get_user_profile(user_id)
         
-        if user:
-            return jsonify({
+        if profile:
+            return conditional_response(ojsonify({
                 'success': True,
-                'user': user.to_dict()
-            }), 200
+                'user': profile
+            }), max_age=0)
         else:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'User not found'
             }), 404
     
     except Exception as e:
         current_app.logger.error(f"Get profile error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to get profile'
         }), 500
@@ -204,17 +220,17 @@ def update_profile():
     """Update user profile"""
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         if not data:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'No data provided'
             }), 400
         
         # Validate email if provided
         if 'email' in data and not validate_email(data['email']):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Invalid email format'
             }), 400
@@ -229,11 +245,11 @@ def update_profile():
                 details={'updated_fields': list(data.keys())}
             )
         
-        return jsonify(result), 200 if result['success'] else 400
+        return ojsonify(result), 200 if result['success'] else 400
     
     except Exception as e:
         current_app.logger.error(f"Update profile error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to update profile'
         }), 500
@@ -245,17 +261,17 @@ def change_password():
     """Change user password"""
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         if not data or not data.get('current_password') or not data.get('new_password'):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Current and new passwords are required'
             }), 400
         
         # Validate new password
         if not validate_password(data['new_password']):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'New password must be at least 8 characters long'
             }), 400
@@ -273,11 +289,11 @@ def change_password():
                 action='change_password'
             )
         
-        return jsonify(result), 200 if result['success'] else 400
+        return ojsonify(result), 200 if result['success'] else 400
     
     except Exception as e:
         current_app.logger.error(f"Change password error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to change password'
         }), 500
@@ -1,19 +1,36 @@
 # backend/routes/content_routes.py
-from flask import request, jsonify, current_app
+from flask import request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select
 from . import content_bp
+from services.azure_openai_service import AI_SLOT_WAIT
 from services.content_service import ContentService
-from services.auth_service import AuthService
+from services.user_cache import get_user_view
 from models import db, ExtractionRule
+from utils.cache import TTLStore
+from utils.json import ojsonify
+from utils.responses import conditional_response
 
 
+# Columns returned by the rule listing, read as plain rows instead of ORM objects
+_RULE_LIST_COLS = (
+    ExtractionRule.id, ExtractionRule.project_id, ExtractionRule.name, ExtractionRule.description,
+    ExtractionRule.rule_type, ExtractionRule.selector, ExtractionRule.attribute, ExtractionRule.transform,
+    ExtractionRule.required, ExtractionRule.multiple, ExtractionRule.is_active, ExtractionRule.priority,
+    ExtractionRule.created_at
+)
+
+# Rule listings per project_id (None for all projects)
+RULES_CACHE_TTL = 30
+_RULES_CACHE = TTLStore()
+
 @content_bp.route('/snippets', methods=['GET'])
 @jwt_required()
 def get_snippets():
     """Get snippets with filtering"""
     try:
         user_id = get_jwt_identity()
-        user = AuthService.get_user_by_id(user_id)
+        user = get_user_view(user_id)
         
         # Get query parameters
         project_id = request.args.get('project_id', type=int)
@@ -31,14 +48,15 @@ def get_snippets():
             user_role=user.role,
             page=page,
             per_page=min(per_page, 100),
-            search=search
+            search=search,
+            cursor=request.args.get('cursor')
         )
         
-        return jsonify(result), 200
+        return ojsonify(result), 200
     
     except Exception as e:
         current_app.logger.error(f"Get snippets error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve snippets'
         }), 500
@@ -50,13 +68,13 @@ def approve_snippet(snippet_id):
     """Approve or reject snippet"""
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         status = data.get('status', 'approved') if data else 'approved'
         review_notes = data.get('review_notes') if data else None
         
         if status not in ['approved', 'rejected']:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Invalid status. Must be approved or rejected'
             }), 400
@@ -68,11 +86,11 @@ def approve_snippet(snippet_id):
             review_notes=review_notes
         )
         
-        return jsonify(result), 200 if result['success'] else 400
+        return ojsonify(result), 200 if result['success'] else 400
     
     except Exception as e:
         current_app.logger.error(f"Approve snippet error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to update snippet status'
         }), 500
@@ -84,10 +102,10 @@ def extract_content():
     """Extract content from page"""
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         if not data or not data.get('page_id'):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Page ID is required'
             }), 400
@@ -98,11 +116,11 @@ def extract_content():
             user_id=user_id
         )
         
-        return jsonify(result), 200 if result['success'] else 400
+        return ojsonify(result), 200 if result['success'] else 400
     
     except Exception as e:
         current_app.logger.error(f"Extract content error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Content extraction failed'
         }), 500
@@ -113,37 +131,52 @@ def extract_content():
 def get_extraction_rules():
     """Get extraction rules"""
     try:
-        project_id = request.args.get('project_id', type=int)
-        
-        query = ExtractionRule.query
-        if project_id:
-            query = query.filter_by(project_id=project_id)
+        project_id = request.args.get('project_id', type=int) or None
         
-        rules = query.order_by(ExtractionRule.priority.desc()).all()
+        # Rules change rarely, so listings are cached briefly per project and tagged
+        # with an ETag; clients always revalidate, getting a bodiless 304 when unchanged
+        rules = _RULES_CACHE.get_or_set(project_id, RULES_CACHE_TTL, lambda: _load_rules(project_id))
         
-        return jsonify({
+        return conditional_response(ojsonify({
             'success': True,
-            'rules': [rule.to_dict() for rule in rules]
-        }), 200
+            'rules': rules
+        }), max_age=0)
     
     except Exception as e:
         current_app.logger.error(f"Get extraction rules error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve extraction rules'
         }), 500
 
 
+def _load_rules(project_id):
+    stmt = select(*_RULE_LIST_COLS)
+    if project_id:
+        stmt = stmt.where(ExtractionRule.project_id == project_id)
+    
+    rows = db.session.execute(stmt.order_by(ExtractionRule.priority.desc())).mappings()
+    return [_rule_row_to_dict(row) for row in rows]
+
+
+def _rule_row_to_dict(row):
+    """Build a rule listing entry from a projected row"""
+    rule = dict(row)
+    if rule['created_at']:
+        rule['created_at'] = rule['created_at'].isoformat()
+    return rule
+
+
 @content_bp.route('/rules', methods=['POST'])
 @jwt_required()
 def create_extraction_rule():
     """Create extraction rule"""
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         if not data or not all(data.get(field) for field in ['project_id', 'name', 'rule_type', 'selector']):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Project ID, name, rule type, and selector are required'
             }), 400
@@ -164,7 +197,11 @@ def create_extraction_rule():
         db.session.add(rule)
         db.session.commit()
         
-        return jsonify({
+        # Drop cached listings that include the new rule
+        _RULES_CACHE.delete(rule.project_id)
+        _RULES_CACHE.delete(None)
+        
+        return ojsonify({
             'success': True,
             'message': 'Extraction rule created successfully',
             'rule': rule.to_dict()
@@ -173,7 +210,7 @@ def create_extraction_rule():
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Create extraction rule error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to create extraction rule'
         }), 500
@@ -185,11 +222,11 @@ def search_content():
     """Search content"""
     try:
         user_id = get_jwt_identity()
-        user = AuthService.get_user_by_id(user_id)
+        user = get_user_view(user_id)
         
         query = request.args.get('q')
         if not query:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Search query is required'
             }), 400
@@ -207,11 +244,11 @@ def search_content():
             per_page=min(per_page, 50)
         )
         
-        return jsonify(result), 200
+        return ojsonify(result), 200
     
     except Exception as e:
         current_app.logger.error(f"Search content error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Search failed'
         }), 500
@@ -223,25 +260,37 @@ def suggest_extraction_rules():
     """Get AI suggestions for extraction rules"""
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         if not data or not data.get('page_id') or not data.get('sample_content'):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Page ID and sample content are required'
             }), 400
         
-        result = ContentService.suggest_extraction_rules(
-            page_id=data['page_id'],
-            sample_content=data['sample_content'],
-            user_id=user_id
-        )
+        # AI calls take seconds; cap how many request threads they can hold so the
+        # rest of the API keeps its workers, and fail fast when all slots are busy
+        ai_slots = current_app.extensions['ai_slots']
+        if not ai_slots.acquire(timeout=AI_SLOT_WAIT):
+            return ojsonify({
+                'success': False,
+                'message': 'AI service is busy, please try again shortly'
+            }), 503
+        
+        try:
+            result = ContentService.suggest_extraction_rules(
+                page_id=data['page_id'],
+                sample_content=data['sample_content'],
+                user_id=user_id
+            )
+        finally:
+            ai_slots.release()
         
-        return jsonify(result), 200 if result['success'] else 400
+        return ojsonify(result), 200 if result['success'] else 400
     
     except Exception as e:
         current_app.logger.error(f"Suggest extraction rules error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to suggest extraction rules'
         }), 500
@@ -1,11 +1,11 @@
 # backend/routes/project_routes.py
-from flask import request, jsonify, current_app
+from flask import request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from . import projects_bp
 from services.project_service import ProjectService
-from services.auth_service import AuthService
-from utils.decorators import admin_required, project_access_required
+from utils.decorators import admin_required, current_role, project_access_required
 from models import db, Website, Project, Page
+from utils.json import ojsonify
 
 
 @projects_bp.route('/<int:project_id>/websites', methods=['GET'])
@@ -45,13 +45,13 @@ def get_project_websites(project_id):
             
             # Add stats (you can extend this based on your needs)
             website_dict.update({
-                'pages_scraped': len(website.pages) if hasattr(website, 'pages') else 0,
+                'pages_scraped': website.total_pages or 0,
                 'last_scraped': website.last_crawled.isoformat() if website.last_crawled else None,
                 'status_display': website.status.title()
             })
             websites_data.append(website_dict)
         
-        return jsonify({
+        return ojsonify({
             'success': True,
             'websites': websites_data,
             'pagination': {
@@ -66,7 +66,7 @@ def get_project_websites(project_id):
     
     except Exception as e:
         current_app.logger.error(f"Get project websites error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve websites'
         }), 500
@@ -78,10 +78,10 @@ def get_projects():
     """Get projects with filtering and pagination"""
     try:
         user_id = get_jwt_identity()
-        user = AuthService.get_user_by_id(user_id)
+        role = current_role()
         
-        if not user:
-            return jsonify({
+        if role is None:
+            return ojsonify({
                 'success': False,
                 'message': 'User not found'
             }), 404
@@ -98,7 +98,7 @@ def get_projects():
         
         result = ProjectService.get_projects(
             user_id=user_id,
-            user_role=user.role,
+            user_role=role,
             page=page,
             per_page=per_page,
             search=search,
@@ -106,11 +106,11 @@ def get_projects():
             industry=industry
         )
         
-        return jsonify(result), 200
+        return ojsonify(result), 200
     
     except Exception as e:
         current_app.logger.error(f"Get projects error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve projects'
         }), 500
@@ -122,10 +122,10 @@ def create_project():
     """Create a new project"""
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         if not data or not data.get('name'):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Project name is required'
             }), 400
@@ -139,11 +139,11 @@ def create_project():
             priority=data.get('priority', 'medium')
         )
         
-        return jsonify(result), 201 if result['success'] else 400
+        return ojsonify(result), 201 if result['success'] else 400
     
     except Exception as e:
         current_app.logger.error(f"Create project error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to create project'
         }), 500
@@ -156,19 +156,19 @@ def get_project(project_id):
     """Get project by ID"""
     try:
         user_id = get_jwt_identity()
-        user = AuthService.get_user_by_id(user_id)
+        role = current_role()
         
         result = ProjectService.get_project_by_id(
             project_id=project_id,
             user_id=user_id,
-            user_role=user.role
+            user_role=role
         )
         
-        return jsonify(result), 200 if result['success'] else 404
+        return ojsonify(result), 200 if result['success'] else 404
     
     except Exception as e:
         current_app.logger.error(f"Get project error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve project'
         }), 500
@@ -181,11 +181,11 @@ def update_project(project_id):
     """Update project"""
     try:
         user_id = get_jwt_identity()
-        user = AuthService.get_user_by_id(user_id)
-        data = request.get_json()
+        role = current_role()
+        data = request.get_json(silent=True)
         
         if not data:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'No data provided'
             }), 400
@@ -193,15 +193,15 @@ def update_project(project_id):
         result = ProjectService.update_project(
             project_id=project_id,
             user_id=user_id,
-            user_role=user.role,
+            user_role=role,
             **data
         )
         
-        return jsonify(result), 200 if result['success'] else 400
+        return ojsonify(result), 200 if result['success'] else 400
     
     except Exception as e:
         current_app.logger.error(f"Update project error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to update project'
         }), 500
@@ -214,19 +214,19 @@ def delete_project(project_id):
     """Delete project"""
     try:
         user_id = get_jwt_identity()
-        user = AuthService.get_user_by_id(user_id)
+        role = current_role()
         
         result = ProjectService.delete_project(
             project_id=project_id,
             user_id=user_id,
-            user_role=user.role
+            user_role=role
         )
         
-        return jsonify(result), 200 if result['success'] else 403
+        return ojsonify(result), 200 if result['success'] else 403
     
     except Exception as e:
         current_app.logger.error(f"Delete project error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to delete project'
         }), 500
@@ -239,19 +239,19 @@ def get_project_collaborators(project_id):
     """Get project collaborators"""
     try:
         user_id = get_jwt_identity()
-        user = AuthService.get_user_by_id(user_id)
+        role = current_role()
         
         result = ProjectService.get_project_collaborators(
             project_id=project_id,
             user_id=user_id,
-            user_role=user.role
+            user_role=role
         )
         
-        return jsonify(result), 200
+        return ojsonify(result), 200
     
     except Exception as e:
         current_app.logger.error(f"Get collaborators error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve collaborators'
         }), 500
@@ -264,11 +264,11 @@ def add_collaborator(project_id):
     """Add collaborator to project"""
     try:
         user_id = get_jwt_identity()
-        user = AuthService.get_user_by_id(user_id)
-        data = request.get_json()
+        role = current_role()
+        data = request.get_json(silent=True)
         
         if not data or not data.get('email'):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Collaborator email is required'
             }), 400
@@ -278,14 +278,14 @@ def add_collaborator(project_id):
             user_id=user_id,
             collaborator_email=data['email'],
             role=data.get('role', 'viewer'),
-            requester_role=user.role
+            requester_role=role
         )
         
-        return jsonify(result), 200 if result['success'] else 400
+        return ojsonify(result), 200 if result['success'] else 400
     
     except Exception as e:
         current_app.logger.error(f"Add collaborator error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to add collaborator'
         }), 500
@@ -298,19 +298,19 @@ def get_project_statistics(project_id):
     """Get project statistics"""
     try:
         user_id = get_jwt_identity()
-        user = AuthService.get_user_by_id(user_id)
+        role = current_role()
         
         result = ProjectService.get_project_statistics(
             project_id=project_id,
             user_id=user_id,
-            user_role=user.role
+            user_role=role
         )
         
-        return jsonify(result), 200
+        return ojsonify(result), 200
     
     except Exception as e:
         current_app.logger.error(f"Get project statistics error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve project statistics'
         }), 500
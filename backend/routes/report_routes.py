@@ -1,9 +1,13 @@
 # backend/routes/report_routes.py
-from flask import request, jsonify, current_app, send_file
+import mimetypes
+import os
+from urllib.parse import quote
+from flask import request, current_app, send_file, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from . import reports_bp
 from services.export_service import ExportService
-from services.auth_service import AuthService
+from services.user_cache import get_user_view
+from utils.json import ojsonify
 
 
 @reports_bp.route('/export', methods=['POST'])
@@ -12,16 +16,16 @@ def create_export():
     """Create export job"""
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         if not data or not data.get('export_type'):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Export type is required'
             }), 400
         
         if data['export_type'] not in ['csv', 'excel', 'pdf', 'json']:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Invalid export type'
             }), 400
@@ -33,11 +37,16 @@ def create_export():
             filename=data.get('filename')
         )
         
-        return jsonify(result), 201 if result['success'] else 400
+        if not result['success']:
+            return ojsonify(result), 400
+        
+        # Accepted for background processing; the status URL reports progress
+        result['status_url'] = url_for('.get_export_status', export_id=result['export']['id'])
+        return ojsonify(result), 202
     
     except Exception as e:
         current_app.logger.error(f"Create export error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to create export'
         }), 500
@@ -49,7 +58,7 @@ def get_exports():
     """Get user's exports"""
     try:
         user_id = get_jwt_identity()
-        user = AuthService.get_user_by_id(user_id)
+        user = get_user_view(user_id)
         
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
@@ -61,11 +70,11 @@ def get_exports():
             per_page=min(per_page, 100)
         )
         
-        return jsonify(result), 200
+        return ojsonify(result), 200
     
     except Exception as e:
         current_app.logger.error(f"Get exports error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve exports'
         }), 500
@@ -77,7 +86,7 @@ def get_export_status(export_id):
     """Get export status"""
     try:
         user_id = get_jwt_identity()
-        user = AuthService.get_user_by_id(user_id)
+        user = get_user_view(user_id)
         
         result = ExportService.get_export_status(
             export_id=export_id,
@@ -85,11 +94,11 @@ def get_export_status(export_id):
             user_role=user.role
         )
         
-        return jsonify(result), 200 if result['success'] else 404
+        return ojsonify(result), 200 if result['success'] else 404
     
     except Exception as e:
         current_app.logger.error(f"Get export status error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to get export status'
         }), 500
@@ -101,7 +110,7 @@ def download_export(export_id):
     """Download export file"""
     try:
         user_id = get_jwt_identity()
-        user = AuthService.get_user_by_id(user_id)
+        user = get_user_view(user_id)
         
         result = ExportService.download_export(
             export_id=export_id,
@@ -110,17 +119,28 @@ def download_export(export_id):
         )
         
         if result['success']:
+            # Behind nginx the file is sent by nginx itself, so this worker is freed at once
+            accel_prefix = current_app.config['EXPORT_ACCEL_REDIRECT_PREFIX']
+            if accel_prefix:
+                response = current_app.response_class(
+                    mimetype=mimetypes.guess_type(result['filename'])[0] or 'application/octet-stream'
+                )
+                response.headers['X-Accel-Redirect'] = accel_prefix + quote(os.path.basename(result['file_path']))
+                response.headers.set('Content-Disposition', 'attachment', filename=result['filename'])
+                return response
+            
+            # Otherwise sent from this worker, or by Apache/lighttpd when USE_X_SENDFILE is on
             return send_file(
                 result['file_path'],
                 as_attachment=True,
                 download_name=result['filename']
             )
         else:
-            return jsonify(result), 400
+            return ojsonify(result), 400
     
     except Exception as e:
         current_app.logger.error(f"Download export error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Download failed'
         }), 500
@@ -1,10 +1,60 @@
 # backend/routes/scraping_routes.py
-from flask import request, jsonify, current_app
+from flask import request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func, select
 from . import scraping_bp
 from services.auth_service import AuthService
-from models import db, Website, Page, Project, ScheduledJob
+from models import db, Website, Page, Project, ScheduledJob, project_collaborators
 from services.scraping_service import ScrapingService
+from utils.cache import TTLStore
+from utils.decorators import current_role
+from utils.json import ojsonify
+from utils.pagination import cursor_pagination, keyset_page, split_page
+from utils.responses import conditional_response
+
+# Job listings read one row per website with its project name; total_pages is the
+# website's maintained page count, so no pages are counted per listing
+_JOB_COLS = (
+    Website.id, Website.name, Website.url, Website.status, Website.total_pages,
+    Website.last_crawled, Website.updated_at,
+    Project.name.label('project_name')
+)
+
+
+# Dashboards poll the job listings; each user's last listing per endpoint is reused briefly
+LISTING_CACHE_TTL = 2  # seconds
+_LISTING_CACHE = TTLStore()
+
+
+def _cached_listing(endpoint, user_id):
+    """Payload cached for this user's last request to endpoint, if it had the same query string"""
+    cached = _LISTING_CACHE.get((endpoint, user_id), LISTING_CACHE_TTL)
+    if cached is not None and cached[0] == request.query_string:
+        return cached[1]
+    return None
+
+
+def _listing_response(endpoint, user_id, payload):
+    """Cache a listing payload and send it with an ETag, so unchanged polls get a 304"""
+    _LISTING_CACHE.set((endpoint, user_id), (request.query_string, payload))
+    return conditional_response(ojsonify(payload), max_age=0)
+
+
+def _accessible_project_ids(user_id):
+    """Select of the projects a user owns or collaborates on, or None for admins, who see all"""
+    if current_role() == 'admin':
+        return None
+    user_id = int(user_id)
+    return select(Project.id).where(Project.owner_id == user_id).union(
+        select(project_collaborators.c.project_id).where(project_collaborators.c.user_id == user_id)
+    )
+
+
+def _job_rows(stmt):
+    """Run a job listing select joined to its project, returning plain rows"""
+    return db.session.execute(
+        stmt.outerjoin(Project, Project.id == Website.project_id)
+    ).all()
 
 
 @scraping_bp.route('/stop/<int:website_id>', methods=['POST'])
@@ -15,21 +65,21 @@ def stop_scraping(website_id):
         user_id = get_jwt_identity()
         
         # Find the website
-        website = Website.query.get(website_id)
+        website = db.session.get(Website, website_id)
         if not website:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Website not found'
             }), 404
         
-        # Use scraping service to stop
-        result = ScrapingService.stop_scraping(website_id)
+        # Use scraping service to stop; it finds the website in the session's identity map
+        result = ScrapingService().stop_crawl(website_id, user_id)
         
-        return jsonify(result), 200 if result['success'] else 400
+        return ojsonify(result), 200 if result['success'] else 400
     
     except Exception as e:
         current_app.logger.error(f"Stop scraping error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to stop scraping'
         }), 500
@@ -41,10 +91,10 @@ def run_scraping():
     """Run scraping for a website"""
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         if not data or not data.get('website_id'):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Website ID is required'
             }), 400
@@ -55,7 +105,7 @@ def run_scraping():
         if data.get('single_page'):
             url = data.get('url')
             if not url:
-                return jsonify({
+                return ojsonify({
                     'success': False,
                     'message': 'URL is required for single page scraping'
                 }), 400
@@ -73,11 +123,11 @@ def run_scraping():
                 use_selenium=data.get('use_selenium', False)
             )
         
-        return jsonify(result), 200 if result['success'] else 400
+        return ojsonify(result), 200 if result['success'] else 400
     
     except Exception as e:
         current_app.logger.error(f"Run scraping error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Scraping failed'
         }), 500
@@ -91,11 +141,11 @@ def get_scraping_status(website_id):
         scraping_service = ScrapingService()
         result = scraping_service.get_crawl_status(website_id)
         
-        return jsonify(result), 200
+        return ojsonify(result), 200
     
     except Exception as e:
         current_app.logger.error(f"Get scraping status error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to get scraping status'
         }), 500
@@ -107,10 +157,10 @@ def schedule_scraping():
     """Schedule scraping job"""
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         if not data or not data.get('website_id'):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Website ID is required'
             }), 400
@@ -123,11 +173,11 @@ def schedule_scraping():
             schedule_config=data.get('schedule_config')
         )
         
-        return jsonify(result), 200 if result['success'] else 400
+        return ojsonify(result), 200 if result['success'] else 400
     
     except Exception as e:
         current_app.logger.error(f"Schedule scraping error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to schedule scraping'
         }), 500
@@ -139,63 +189,92 @@ def get_scraping_jobs():
     try:
         user_id = get_jwt_identity()
         
+        payload = _cached_listing('jobs', user_id)
+        if payload is not None:
+            return conditional_response(ojsonify(payload), max_age=0)
+        
         # Get query parameters
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
         status = request.args.get('status')
         project_id = request.args.get('project_id', type=int)
+        cursor = request.args.get('cursor')
+        # Counting every matching website is only done when asked for
+        include_count = request.args.get('count', 'false') == 'true'
         
         # For now, return basic website info with mock status
         # In a real implementation, you'd have a separate JobStatus model
-        query = Website.query
+        stmt = select(*_JOB_COLS)
+        count_stmt = select(func.count()).select_from(Website)
+        
+        # Only websites in projects the user can access
+        project_ids = _accessible_project_ids(user_id)
+        if project_ids is not None:
+            stmt = stmt.where(Website.project_id.in_(project_ids))
+            count_stmt = count_stmt.where(Website.project_id.in_(project_ids))
         
         # Filter by project if specified
         if project_id:
-            query = query.filter_by(project_id=project_id)
-        
-        # Order by most recent first
-        query = query.order_by(Website.updated_at.desc())
+            stmt = stmt.where(Website.project_id == project_id)
+            count_stmt = count_stmt.where(Website.project_id == project_id)
         
-        # Paginate
-        pagination = query.paginate(
-            page=page, per_page=min(per_page, 100), error_out=False
-        )
+        # Most recent first. Cursor requests seek past the last row seen instead of
+        # offsetting, which the (project_id, updated_at) index serves for a single project
+        if cursor is not None:
+            rows, next_cursor = split_page(
+                _job_rows(keyset_page(stmt, Website, cursor, per_page, sort_key='updated_at', nullable=True)),
+                per_page, sort_key='updated_at'
+            )
+            pagination = cursor_pagination(per_page, cursor, next_cursor)
+        else:
+            # One extra row tells us whether a next page exists without counting
+            rows = _job_rows(
+                stmt.order_by(Website.updated_at.desc().nulls_last(), Website.id.desc())
+                .offset((page - 1) * per_page).limit(per_page + 1)
+            )
+            has_next = len(rows) > per_page
+            rows = rows[:per_page]
+            total = db.session.execute(count_stmt).scalar() if include_count else None
+            pagination = {
+                'page': page,
+                'pages': (total + per_page - 1) // per_page if include_count else None,
+                'per_page': per_page,
+                'total': total,
+                'has_next': has_next,
+                'has_prev': page > 1
+            }
         
         # Format results with basic info
         jobs_data = []
-        for website in pagination.items:
-            project = Project.query.get(website.project_id)
-            
+        for row in rows:
             job_dict = {
-                'id': website.id,
-                'website_id': website.id,
-                'website_name': website.name or 'Unnamed Website',
-                'website_url': website.url,
-                'project_name': project.name if project else 'Unknown',
-                'status': website.status or 'inactive',
-                'pages_scraped': len(website.pages),
-                'total_pages_found': website.total_pages or 0,
-                'started_at': website.last_crawled.isoformat() if website.last_crawled else None,
+                'id': row.id,
+                'website_id': row.id,
+                'website_name': row.name or 'Unnamed Website',
+                'website_url': row.url,
+                'project_name': row.project_name or 'Unknown',
+                'status': row.status or 'inactive',
+                'pages_scraped': row.total_pages or 0,
+                'total_pages_found': row.total_pages or 0,
+                'started_at': row.last_crawled.isoformat() if row.last_crawled else None,
                 'progress_percentage': 0.0  # Placeholder
             }
             jobs_data.append(job_dict)
         
-        return jsonify({
+        return _listing_response('jobs', user_id, {
             'success': True,
             'jobs': jobs_data,
-            'pagination': {
-                'page': pagination.page,
-                'pages': pagination.pages,
-                'per_page': pagination.per_page,
-                'total': pagination.total,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
-        }), 200
+            'pagination': pagination
+        })
     
+    except ValueError:
+        return ojsonify({
+            'success': False,
+            'message': 'Invalid cursor'
+        }), 400
     except Exception as e:
         current_app.logger.error(f"Get scraping jobs error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve scraping jobs'
         }), 500
@@ -208,39 +287,44 @@ def get_all_scraping_status():
     try:
         user_id = get_jwt_identity()
         
-        # Get active websites (representing active scraping jobs)
-        active_websites = Website.query.filter(
-            Website.status.in_(['active'])
-        ).order_by(Website.updated_at.desc()).limit(50).all()
+        payload = _cached_listing('status', user_id)
+        if payload is not None:
+            return conditional_response(ojsonify(payload), max_age=0)
+        
+        # Get active websites (representing active scraping jobs) in the user's projects;
+        # the newest-first scan is served by the partial active-websites index
+        stmt = select(*_JOB_COLS).where(Website.status == 'active')
+        project_ids = _accessible_project_ids(user_id)
+        if project_ids is not None:
+            stmt = stmt.where(Website.project_id.in_(project_ids))
+        active_websites = _job_rows(stmt.order_by(Website.updated_at.desc().nulls_last()).limit(50))
         
         status_data = []
-        for website in active_websites:
-            project = Project.query.get(website.project_id)
-            
+        for row in active_websites:
             status_dict = {
-                'job_id': website.id,
-                'website_id': website.id,
-                'website_name': website.name or 'Unnamed Website',
-                'website_url': website.url,
-                'project_name': project.name if project else 'Unknown',
-                'status': website.status or 'inactive',
-                'pages_scraped': len(website.pages),
-                'total_pages': website.total_pages or 0,
-                'started_at': website.last_crawled.isoformat() if website.last_crawled else None,
-                'last_activity': website.updated_at.isoformat() if website.updated_at else None,
+                'job_id': row.id,
+                'website_id': row.id,
+                'website_name': row.name or 'Unnamed Website',
+                'website_url': row.url,
+                'project_name': row.project_name or 'Unknown',
+                'status': row.status or 'inactive',
+                'pages_scraped': row.total_pages or 0,
+                'total_pages': row.total_pages or 0,
+                'started_at': row.last_crawled.isoformat() if row.last_crawled else None,
+                'last_activity': row.updated_at.isoformat() if row.updated_at else None,
                 'progress_percentage': 0.0  # Placeholder - calculate based on actual logic
             }
             status_data.append(status_dict)
         
-        return jsonify({
+        return _listing_response('status', user_id, {
             'success': True,
             'active_jobs': status_data,
             'total_active': len(status_data)
-        }), 200
+        })
     
     except Exception as e:
         current_app.logger.error(f"Get all scraping status error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve scraping status'
         }), 500
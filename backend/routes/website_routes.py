@@ -1,11 +1,49 @@
 # backend/routes/website_routes.py
-from flask import request, jsonify, current_app
+from flask import request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from . import websites_bp
-from services.auth_service import AuthService
+from services.auth_service import AuthService, AuthorizationService
+from services.user_cache import get_user_view
 from models import db, Website, Project
 from utils.decorators import project_access_required
 from utils.validators import validate_url
+from utils.json import ojsonify
+
+
+# Largest batch accepted by the bulk create endpoint
+BULK_MAX_WEBSITES = 500
+
+
+def _build_website(data):
+    """Website from a create request's fields"""
+    website = Website(
+        project_id=data['project_id'],
+        url=data['url'].strip(),
+        name=data.get('name', '').strip(),
+        description=data.get('description', '').strip(),
+        crawl_depth=data.get('crawl_depth', 1),
+        follow_external_links=data.get('follow_external_links', False),
+        respect_robots_txt=data.get('respect_robots_txt', True),
+        rate_limit_delay=float(data.get('rate_limit_delay', 1.0)),
+        auth_type=data.get('auth_type', 'none')
+    )
+    
+    # Set auth config if provided
+    if data.get('auth_config'):
+        website.set_auth_config(data['auth_config'])
+    
+    return website
+
+
+def _project_id(value):
+    """A request's project id as an int, or None if it is missing or not an integer"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value if value > 0 else None
+    if isinstance(value, str) and value.strip().isdecimal():
+        return int(value) or None
+    return None
 
 
 @websites_bp.route('', methods=['POST'])
@@ -14,84 +52,175 @@ def create_website():
     """Create a new website"""
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
-        if not data or not data.get('project_id') or not data.get('url'):
-            return jsonify({
+        project_id = _project_id(data.get('project_id')) if isinstance(data, dict) else None
+        if project_id is None or not data.get('url'):
+            return ojsonify({
                 'success': False,
                 'message': 'Project ID and URL are required'
             }), 400
+        data['project_id'] = project_id
         
         # Validate URL
         if not validate_url(data['url']):
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Invalid URL format'
             }), 400
         
         # Check project access
-        project = Project.query.get(data['project_id'])
+        project = db.session.get(Project, project_id)
         if not project:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Project not found'
             }), 404
         
+        user = get_user_view(user_id)
+        if not user or not AuthorizationService.can_access_project(user, project):
+            return ojsonify({
+                'success': False,
+                'message': 'Access denied'
+            }), 403
+        
         # Create website
-        website = Website(
-            project_id=data['project_id'],
-            url=data['url'].strip(),
-            name=data.get('name', '').strip(),
-            description=data.get('description', '').strip(),
-            crawl_depth=data.get('crawl_depth', 1),
-            follow_external_links=data.get('follow_external_links', False),
-            respect_robots_txt=data.get('respect_robots_txt', True),
-            rate_limit_delay=float(data.get('rate_limit_delay', 1.0)),
-            auth_type=data.get('auth_type', 'none')
-        )
-        
-        # Set auth config if provided
-        if data.get('auth_config'):
-            website.set_auth_config(data['auth_config'])
+        website = _build_website(data)
         
         db.session.add(website)
+        # Serialize once flushed, since commit would expire the instance and to_dict
+        # would then re-SELECT it
+        db.session.flush()
+        website_data = website.to_dict()
         db.session.commit()
         
-        return jsonify({
+        return ojsonify({
             'success': True,
             'message': 'Website created successfully',
-            'website': website.to_dict()
+            'website': website_data
         }), 201
     
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Create website error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to create website'
         }), 500
 
 
+@websites_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_websites():
+    """Create many websites in one transaction"""
+    try:
+        data = request.get_json(silent=True)
+        rows = data.get('websites') if isinstance(data, dict) else None
+        
+        if not isinstance(rows, list) or not rows:
+            return ojsonify({
+                'success': False,
+                'message': 'A non-empty websites list is required'
+            }), 400
+        
+        if len(rows) > BULK_MAX_WEBSITES:
+            return ojsonify({
+                'success': False,
+                'message': f'At most {BULK_MAX_WEBSITES} websites can be created at once'
+            }), 400
+        
+        # Validate every row up front, so the batch is created whole or not at all
+        errors = []
+        for index, row in enumerate(rows):
+            project_id = _project_id(row.get('project_id')) if isinstance(row, dict) else None
+            if project_id is None or not row.get('url'):
+                errors.append({'index': index, 'message': 'Project ID and URL are required'})
+            elif not validate_url(row['url']):
+                errors.append({'index': index, 'message': 'Invalid URL format'})
+            else:
+                row['project_id'] = project_id
+        
+        if errors:
+            return ojsonify({
+                'success': False,
+                'message': 'Invalid websites',
+                'errors': errors
+            }), 400
+        
+        # One query loads every referenced project, each checked like a single create
+        user = get_user_view(get_jwt_identity())
+        if not user:
+            return ojsonify({
+                'success': False,
+                'message': 'User not found'
+            }), 404
+        
+        project_ids = {row['project_id'] for row in rows}
+        projects = {
+            project.id: project
+            for project in Project.query.filter(Project.id.in_(project_ids)).all()
+        }
+        allowed = {
+            project_id for project_id, project in projects.items()
+            if AuthorizationService.can_access_project(user, project)
+        }
+        
+        for index, row in enumerate(rows):
+            if row['project_id'] not in projects:
+                errors.append({'index': index, 'message': 'Project not found'})
+            elif row['project_id'] not in allowed:
+                errors.append({'index': index, 'message': 'Access denied'})
+        
+        if errors:
+            denied = any(error['message'] == 'Access denied' for error in errors)
+            return ojsonify({
+                'success': False,
+                'message': 'Access denied' if denied else 'Invalid websites',
+                'errors': errors
+            }), 403 if denied else 400
+        
+        # The flush batches the INSERTs, and one commit covers the whole batch
+        websites = [_build_website(row) for row in rows]
+        db.session.add_all(websites)
+        db.session.flush()
+        website_ids = [website.id for website in websites]
+        db.session.commit()
+        
+        return ojsonify({
+            'success': True,
+            'message': f'{len(website_ids)} websites created successfully',
+            'website_ids': website_ids
+        }), 201
+    
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Bulk create websites error: {e}")
+        return ojsonify({
+            'success': False,
+            'message': 'Failed to create websites'
+        }), 500
+
+
 @websites_bp.route('/<int:website_id>', methods=['GET'])
 @jwt_required()
 def get_website(website_id):
     """Get website by ID"""
     try:
-        website = Website.query.get(website_id)
+        website = db.session.get(Website, website_id)
         if not website:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Website not found'
             }), 404
         
-        return jsonify({
+        return ojsonify({
             'success': True,
             'website': website.to_dict(include_stats=True)
         }), 200
     
     except Exception as e:
         current_app.logger.error(f"Get website error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to retrieve website'
         }), 500
@@ -102,16 +231,16 @@ def get_website(website_id):
 def update_website(website_id):
     """Update website"""
     try:
-        website = Website.query.get(website_id)
+        website = db.session.get(Website, website_id)
         if not website:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Website not found'
             }), 404
         
-        data = request.get_json()
+        data = request.get_json(silent=True)
         if not data:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'No data provided'
             }), 400
@@ -131,18 +260,21 @@ def update_website(website_id):
         if 'auth_config' in data:
             website.set_auth_config(data['auth_config'])
         
+        # Serialize before commit expires the instance, as in create_website
+        db.session.flush()
+        website_data = website.to_dict()
         db.session.commit()
         
-        return jsonify({
+        return ojsonify({
             'success': True,
             'message': 'Website updated successfully',
-            'website': website.to_dict()
+            'website': website_data
         }), 200
     
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Update website error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to update website'
         }), 500
@@ -153,9 +285,9 @@ def update_website(website_id):
 def delete_website(website_id):
     """Delete website"""
     try:
-        website = Website.query.get(website_id)
+        website = db.session.get(Website, website_id)
         if not website:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Website not found'
             }), 404
@@ -163,7 +295,7 @@ def delete_website(website_id):
         db.session.delete(website)
         db.session.commit()
         
-        return jsonify({
+        return ojsonify({
             'success': True,
             'message': 'Website deleted successfully'
         }), 200
@@ -171,7 +303,7 @@ def delete_website(website_id):
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Delete website error: {e}")
-        return jsonify({
+        return ojsonify({
             'success': False,
             'message': 'Failed to delete website'
         }), 500
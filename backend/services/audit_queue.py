@@ -0,0 +1,75 @@
+# backend/services/audit_queue.py
+from datetime import datetime
+import orjson
+from models import db, AuditLog
+from services.batch_writer import BatchWriter
+
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.25  # seconds to wait for a batch to fill
+
+def enqueue(user_id, action, resource_type=None, resource_id=None,
+            details=None, ip_address=None, user_agent=None):
+    """Queue an audit entry to be written by the background writer
+    
+    details is normalized to plain JSON types here, so an unserializable payload
+    raises TypeError at the call site instead of failing the background batch.
+    """
+    if details is not None:
+        details = orjson.loads(orjson.dumps(details))
+    
+    if isinstance(user_id, str):
+        user_id = int(user_id)
+    
+    _writer.put({
+        'user_id': user_id,
+        'action': action,
+        'resource_type': resource_type,
+        'resource_id': resource_id,
+        'details': details,
+        'ip_address': ip_address,
+        'user_agent': user_agent,
+        'created_at': datetime.utcnow()
+    })
+
+
+def flush():
+    """Synchronously write whatever is still queued (best effort, used at exit)"""
+    _writer.flush()
+
+
+def _audit_log(entry):
+    entry = dict(entry)
+    details = entry.pop('details')
+    audit_log = AuditLog(**entry)
+    if details:
+        audit_log.set_details(details)
+    return audit_log
+
+
+def _write_batch(app, batch):
+    """Insert a batch of audit entries in a single transaction, falling back to one per entry"""
+    with app.app_context():
+        try:
+            db.session.add_all([_audit_log(entry) for entry in batch])
+            db.session.commit()
+            return
+        
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) == 1:
+                app.logger.error(f"Audit entry dropped ({batch[0]['action']}): {e}")
+                return
+            app.logger.warning(f"Audit batch write error ({len(batch)} entries), retrying one by one: {e}")
+        
+        # Only the entries that fail on their own are dropped
+        for entry in batch:
+            try:
+                db.session.add(_audit_log(entry))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error(f"Audit entry dropped ({entry['action']}): {e}")
+
+
+# Each app's entries are written by its own thread, through its own context
+_writer = BatchWriter('audit-writer', _write_batch, BATCH_SIZE, FLUSH_INTERVAL)
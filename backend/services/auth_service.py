@@ -1,10 +1,79 @@
 # backend/services/auth_service.py
 from datetime import datetime, timedelta
 from flask import current_app
-from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
+from flask_jwt_extended import create_access_token, create_refresh_token
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.exc import IntegrityError
 from models import db, User, AuditLog
+from services import audit_queue, login_queue
+from services.user_cache import get_user_view, invalidate_user
+from utils.cache import TTLStore
+from utils.pagination import cursor_pagination, keyset_page, split_page
+from utils.validators import normalize_email
 import secrets
-import string
+
+# Built once, so login reuses the same statement and its cached compiled SQL
+_USER_BY_EMAIL = select(User).where(User.email == bindparam('email'))
+
+# Role levels for has_role; higher levels include the permissions of lower ones
+ROLE_LEVELS = {
+    'admin': 3,
+    'user': 1
+}
+
+# Collaborator roles allowed to edit a project
+PROJECT_EDIT_ROLES = frozenset({'owner', 'collaborator'})
+
+# Unique constraints that reject a duplicate email: the setup index, and the
+# name PostgreSQL gives a unique=True column
+EMAIL_UNIQUE_CONSTRAINTS = frozenset({'uq_users_email', 'users_email_key'})
+
+AUDIT_COUNT_TTL = 60  # seconds
+
+_AUDIT_COUNTS = TTLStore()
+_AUDIT_LOGS_RELTUPLES = text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'audit_logs'")
+
+_DUMMY_USER = None
+
+
+def _dummy_user():
+    """Unsaved user with a random password, hashed the same way as real accounts"""
+    global _DUMMY_USER
+    if _DUMMY_USER is None:
+        dummy = User()
+        dummy.set_password(secrets.token_urlsafe(32))
+        _DUMMY_USER = dummy
+    return _DUMMY_USER
+
+
+def _is_duplicate_email(error):
+    """Whether a failed write was rejected by the unique email index rather than another constraint"""
+    if not isinstance(error, IntegrityError):
+        return False
+    
+    # psycopg2 names the violated constraint; SQLite only names the columns
+    diag = getattr(error.orig, 'diag', None)
+    constraint = getattr(diag, 'constraint_name', None)
+    if constraint is not None:
+        return constraint in EMAIL_UNIQUE_CONSTRAINTS
+    return 'UNIQUE constraint failed: users.email' in str(error.orig)
+
+
+def _audit_log_total(query, filters):
+    """Audit log total for a set of filters, cached for AUDIT_COUNT_TTL seconds
+    
+    The unfiltered total on PostgreSQL comes from the planner's table statistics
+    rather than a full COUNT(*) scan.
+    """
+    total = _AUDIT_COUNTS.get(filters, AUDIT_COUNT_TTL)
+    if total is None:
+        if not any(filters) and db.engine.dialect.name == 'postgresql':
+            total = db.session.execute(_AUDIT_LOGS_RELTUPLES).scalar()
+        if total is None or total < 0:
+            total = query.order_by(None).count()
+        total = int(total)
+        _AUDIT_COUNTS.set(filters, total)
+    return total
 
 
 class AuthService:
@@ -14,9 +83,11 @@ class AuthService:
     def authenticate_user(email, password):
         """Authenticate user with email and password"""
         try:
-            user = User.query.filter_by(email=email.lower().strip()).first()
+            user = db.session.execute(_USER_BY_EMAIL, {'email': normalize_email(email)}).scalar()
             
+            # Unknown emails still pay for a hash check, so response time doesn't reveal them
             if not user:
+                _dummy_user().check_password(password)
                 return {
                     'success': False,
                     'message': 'Invalid email or password',
@@ -24,28 +95,29 @@ class AuthService:
                     'tokens': None
                 }
             
-            if not user.is_active:
+            if not user.check_password(password):
                 return {
                     'success': False,
-                    'message': 'Account is deactivated',
+                    'message': 'Invalid email or password',
                     'user': None,
                     'tokens': None
                 }
             
-            if not user.check_password(password):
+            # Only reported once the password matched, so it can't be used to probe emails
+            if not user.is_active:
                 return {
                     'success': False,
-                    'message': 'Invalid email or password',
+                    'message': 'Account is deactivated',
                     'user': None,
                     'tokens': None
                 }
             
-            # Update last login
-            user.last_login = datetime.utcnow()
-            db.session.commit()
+            # Last login is written in the background, in batches
+            login_queue.record(user.id)
             
             # Generate tokens - FIXED: Use string identity
-            access_token = create_access_token(identity=str(user.id))
+            # The role claim lets admin checks skip the user lookup
+            access_token = create_access_token(identity=str(user.id), additional_claims={'role': user.role})
             refresh_token = create_refresh_token(identity=str(user.id))
             
             return {
@@ -71,21 +143,9 @@ class AuthService:
     def register_user(email, password, first_name, last_name, role='user'):
         """Register a new user"""
         try:
-            # Validate email uniqueness
-            print(f"Validating email: {email}")
-            existing_user = User.query.filter_by(email=email.lower().strip()).first()
-            if existing_user:
-                return {
-                    'success': False,
-                    'message': 'Email already registered',
-                    'user': None
-                }
-            else:
-                print(f"Registering new user: {email}")
-            
             # Create user
             user = User(
-                email=email.lower().strip(),
+                email=normalize_email(email),
                 first_name=first_name.strip(),
                 last_name=last_name.strip(),
                 role=role,
@@ -93,6 +153,7 @@ class AuthService:
             )
             user.set_password(password)
             
+            # The unique email index rejects duplicates, without a racy pre-check
             db.session.add(user)
             db.session.commit()
             
@@ -104,6 +165,12 @@ class AuthService:
             
         except Exception as e:
             db.session.rollback()
+            if _is_duplicate_email(e):
+                return {
+                    'success': False,
+                    'message': 'Email already registered',
+                    'user': None
+                }
             current_app.logger.error(f"Registration error: {e}")
             return {
                 'success': False,
@@ -112,17 +179,12 @@ class AuthService:
             }
     
     @staticmethod
-    def refresh_access_token(refresh_token):
-        """Generate new access token from refresh token"""
+    def refresh_access_token(user_id):
+        """Generate new access token for the user of an already verified refresh token"""
         try:
-            # Decode refresh token to get user ID
-            token_data = decode_token(refresh_token)
-            user_id_str = token_data['sub']
-            user_id = int(user_id_str)  # Convert back to int for database query
-            
             # Verify user still exists and is active
-            user = User.query.get(user_id)
-            if not user or not user.is_active:
+            user = get_user_view(user_id)
+            if not user:
                 return {
                     'success': False,
                     'message': 'Invalid refresh token',
@@ -130,7 +192,8 @@ class AuthService:
                 }
             
             # Generate new access token - FIXED: Use string identity
-            access_token = create_access_token(identity=str(user_id))
+            # Role is re-read from the user here, so role changes take effect on refresh
+            access_token = create_access_token(identity=str(user.id), additional_claims={'role': user.role})
             
             return {
                 'success': True,
@@ -154,7 +217,7 @@ class AuthService:
             if isinstance(user_id, str):
                 user_id = int(user_id)
             
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if user and user.is_active:
                 return user
             return None
@@ -173,7 +236,7 @@ class AuthService:
             if isinstance(user_id, str):
                 user_id = int(user_id)
             
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return {
                     'success': False,
@@ -185,18 +248,12 @@ class AuthService:
             for field, value in kwargs.items():
                 if field in allowed_fields and value is not None:
                     if field == 'email':
-                        value = value.lower().strip()
-                        # Check email uniqueness
-                        existing = User.query.filter_by(email=value).filter(User.id != user_id).first()
-                        if existing:
-                            return {
-                                'success': False,
-                                'message': 'Email already in use'
-                            }
+                        value = normalize_email(value)
                     setattr(user, field, value)
             
             user.updated_at = datetime.utcnow()
             db.session.commit()
+            invalidate_user(user_id)
             
             return {
                 'success': True,
@@ -206,6 +263,11 @@ class AuthService:
             
         except Exception as e:
             db.session.rollback()
+            if _is_duplicate_email(e):
+                return {
+                    'success': False,
+                    'message': 'Email already in use'
+                }
             current_app.logger.error(f"Update profile error: {e}")
             return {
                 'success': False,
@@ -220,7 +282,7 @@ class AuthService:
             if isinstance(user_id, str):
                 user_id = int(user_id)
             
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return {
                     'success': False,
@@ -238,6 +300,7 @@ class AuthService:
             user.set_password(new_password)
             user.updated_at = datetime.utcnow()
             db.session.commit()
+            invalidate_user(user_id)
             
             return {
                 'success': True,
@@ -256,8 +319,10 @@ class AuthService:
     def generate_password_reset_token(email):
         """Generate password reset token"""
         try:
-            user = User.query.filter_by(email=email.lower().strip()).first()
-            if not user:
+            user_id = db.session.execute(
+                select(User.id).where(User.email == normalize_email(email))
+            ).scalar()
+            if not user_id:
                 # Don't reveal if email exists for security
                 return {
                     'success': True,
@@ -265,7 +330,7 @@ class AuthService:
                 }
             
             # Generate reset token (in real implementation, store this securely)
-            reset_token = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(32))
+            reset_token = secrets.token_urlsafe(24)
             
             # TODO: Store reset token in database with expiration
             # TODO: Send email with reset instructions
@@ -290,15 +355,7 @@ class AuthorizationService:
     @staticmethod
     def has_role(user, required_role):
         """Check if user has required role"""
-        role_hierarchy = {
-            'admin': 3,
-            'user': 1
-        }
-        
-        user_level = role_hierarchy.get(user.role, 0)
-        required_level = role_hierarchy.get(required_role, 0)
-        
-        return user_level >= required_level
+        return ROLE_LEVELS.get(user.role, 0) >= ROLE_LEVELS.get(required_role, 0)
     
     @staticmethod
     def can_access_project(user, project):
@@ -324,7 +381,7 @@ class AuthorizationService:
         
         # Check if user is a collaborator with edit permissions
         role = project.get_collaborator_role(user.id)
-        return role in ['owner', 'collaborator']
+        return role in PROJECT_EDIT_ROLES
     
     @staticmethod
     def can_delete_project(user, project):
@@ -341,36 +398,26 @@ class AuditService:
     @staticmethod
     def log_action(user_id, action, resource_type=None, resource_id=None, 
                    details=None, ip_address=None, user_agent=None):
-        """Log user action for audit purposes"""
+        """Log user action for audit purposes (written in the background, in batches)"""
         try:
-            # Convert string to int if needed
-            if isinstance(user_id, str):
-                user_id = int(user_id)
-            
-            audit_log = AuditLog(
+            audit_queue.enqueue(
                 user_id=user_id,
                 action=action,
                 resource_type=resource_type,
                 resource_id=resource_id,
+                details=details,
                 ip_address=ip_address,
                 user_agent=user_agent
             )
             
-            if details:
-                audit_log.set_details(details)
-            
-            db.session.add(audit_log)
-            db.session.commit()
-            
         except Exception as e:
             current_app.logger.error(f"Audit logging error: {e}")
             # Don't fail the main operation if audit logging fails
-            db.session.rollback()
     
     @staticmethod
     def get_audit_logs(user_id=None, action=None, resource_type=None, 
-                       start_date=None, end_date=None, page=1, per_page=50):
-        """Get audit logs with filtering"""
+                       start_date=None, end_date=None, page=1, per_page=50, cursor=None):
+        """Get audit logs with filtering, by page number or by cursor"""
         try:
             query = AuditLog.query
             
@@ -392,27 +439,42 @@ class AuditService:
             if end_date:
                 query = query.filter(AuditLog.created_at <= end_date)
             
-            # Order by most recent first
-            query = query.order_by(AuditLog.created_at.desc())
+            # Cursor requests seek past the last log seen, skipping OFFSET and COUNT
+            if cursor is not None:
+                logs, next_cursor = split_page(keyset_page(query, AuditLog, cursor, per_page).all(), per_page)
+                return {
+                    'success': True,
+                    'logs': [log.to_dict() for log in logs],
+                    'pagination': cursor_pagination(per_page, cursor, next_cursor)
+                }
             
-            # Paginate
-            pagination = query.paginate(
-                page=page, per_page=per_page, error_out=False
+            page = max(page, 1)
+            total = _audit_log_total(
+                query, (user_id, action, resource_type, start_date, end_date)
             )
             
+            # Order by most recent first, with a lookahead row so has_next needs no count
+            logs = query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).offset(
+                (page - 1) * per_page
+            ).limit(per_page + 1).all()
+            has_next = len(logs) > per_page
+            
             return {
                 'success': True,
-                'logs': [log.to_dict() for log in pagination.items],
+                'logs': [log.to_dict() for log in logs[:per_page]],
                 'pagination': {
-                    'page': pagination.page,
-                    'pages': pagination.pages,
-                    'per_page': pagination.per_page,
-                    'total': pagination.total,
-                    'has_next': pagination.has_next,
-                    'has_prev': pagination.has_prev
+                    'page': page,
+                    'pages': (total + per_page - 1) // per_page if per_page else 0,
+                    'per_page': per_page,
+                    'total': total,
+                    'has_next': has_next,
+                    'has_prev': page > 1
                 }
             }
             
+        except ValueError:
+            # Malformed cursor; the route answers 400 like the other cursor listings
+            raise
         except Exception as e:
             current_app.logger.error(f"Get audit logs error: {e}")
             return {
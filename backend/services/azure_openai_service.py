@@ -2,6 +2,7 @@
 import os
 import json
 import re
+import threading
 from datetime import datetime
 from flask import current_app
 from openai import AzureOpenAI
@@ -410,6 +411,17 @@ class AzureOpenAIService:
         }
 
 
+# Seconds a request waits for a free AI slot before giving up
+AI_SLOT_WAIT = 2
+
+
+def init_ai_slots(app):
+    """Cap how many threads can wait on Azure OpenAI at once, across every route that calls it"""
+    app.extensions['ai_slots'] = threading.BoundedSemaphore(
+        app.config.get('AZURE_OPENAI_MAX_CONCURRENT', 4)
+    )
+
+
 # Singleton instance
 _azure_openai_service = None
 
@@ -0,0 +1,87 @@
+# backend/services/batch_writer.py
+import atexit
+import queue
+import threading
+import time
+from flask import current_app
+
+
+class BatchWriter:
+    """Per-app queue drained in batches by background threads
+    
+    Each app gets its own queue and threads, kept in app.extensions under the
+    writer's name, so items are always handled through the app that queued them.
+    write_batch(app, batch) is called with up to batch_size items, or with what
+    arrived within flush_interval seconds of the first one.
+    """
+    
+    def __init__(self, name, write_batch, batch_size=1, flush_interval=0,
+                 workers_config=None, flush_at_exit=True):
+        self.name = name
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Config key holding the app's thread count; one thread when unset
+        self.workers_config = workers_config
+        self._apps = []
+        self._lock = threading.Lock()
+        
+        if flush_at_exit:
+            atexit.register(self.flush)
+    
+    def put(self, item):
+        """Queue an item for the current app's background threads"""
+        self._queue(current_app._get_current_object()).put(item)
+    
+    def flush(self):
+        """Synchronously handle whatever is still queued (best effort, used at exit)"""
+        for app in list(self._apps):
+            app_queue = app.extensions[self.name]
+            batch = []
+            while True:
+                try:
+                    batch.append(app_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            if batch:
+                self.write_batch(app, batch)
+    
+    def _queue(self, app):
+        """The app's queue, starting its threads on first use"""
+        app_queue = app.extensions.get(self.name)
+        if app_queue is not None:
+            return app_queue
+        
+        with self._lock:
+            app_queue = app.extensions.get(self.name)
+            if app_queue is None:
+                app_queue = queue.SimpleQueue()
+                workers = app.config[self.workers_config] if self.workers_config else 1
+                for i in range(workers):
+                    threading.Thread(
+                        target=self._drain, args=(app, app_queue), name=f'{self.name}-{i}', daemon=True
+                    ).start()
+                app.extensions[self.name] = app_queue
+                self._apps.append(app)
+        return app_queue
+    
+    def _drain(self, app, app_queue):
+        while True:
+            batch = [app_queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(app_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                self.write_batch(app, batch)
+            except Exception as e:
+                # Keep the thread alive; write_batch reports its own failures
+                app.logger.error(f"{self.name} batch error ({len(batch)} items): {e}")
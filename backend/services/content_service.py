@@ -8,6 +8,7 @@ from models import db, Page, Snippet, ExtractionRule, Website, Project
 from services.auth_service import AuthorizationService, AuditService
 from services.azure_openai_service import get_azure_openai_service
 from sqlalchemy import text, desc, func
+from utils.pagination import cursor_pagination, keyset_page, split_page
 
 
 class ContentService:
@@ -344,8 +345,8 @@ class ContentService:
     
     @staticmethod
     def get_snippets(project_id=None, page_id=None, status=None, user_id=None, user_role='user', 
-                     page=1, per_page=50, search=None):
-        """Get snippets with filtering and pagination"""
+                     page=1, per_page=50, search=None, cursor=None):
+        """Get snippets with filtering, by page number or by cursor"""
         try:
             query = Snippet.query.join(Page).join(Website)
             
@@ -373,6 +374,15 @@ class ContentService:
                     )
                 )
             
+            # Cursor requests seek past the last snippet seen, skipping OFFSET and COUNT
+            if cursor is not None:
+                snippets, next_cursor = split_page(keyset_page(query, Snippet, cursor, per_page).all(), per_page)
+                return {
+                    'success': True,
+                    'snippets': [snippet.to_dict() for snippet in snippets],
+                    'pagination': cursor_pagination(per_page, cursor, next_cursor)
+                }
+            
             # Order by most recent first
             query = query.order_by(desc(Snippet.created_at))
             
@@ -475,8 +485,8 @@ class ContentService:
             
             # Build FTS query
             fts_query = text("""
-                SELECT page_id, title, content, url,
-                       snippet(pages_fts, 2, '<mark>', '</mark>', '...', 32) as highlight
+                SELECT rowid AS page_id, title, extracted_text AS content, url,
+                       snippet(pages_fts, 1, '<mark>', '</mark>', '...', 32) as highlight
                 FROM pages_fts 
                 WHERE pages_fts MATCH :query
                 ORDER BY rank
@@ -0,0 +1,29 @@
+# backend/services/export_queue.py
+from services.batch_writer import BatchWriter
+
+
+def enqueue(export_id):
+    """Queue a pending export to be built by one of the app's background workers
+    
+    The queue lives in memory only: exports still queued when the process stops
+    are not resumed and stay 'pending'; the client has to create a new export.
+    """
+    _workers.put(export_id)
+
+
+def _process_batch(app, batch):
+    # export_service enqueues through this module, so it is imported once a worker runs
+    from services.export_service import ExportService
+    
+    for export_id in batch:
+        with app.app_context():
+            try:
+                ExportService._process_export(export_id)
+            except Exception as e:
+                # _process_export has already marked the export failed
+                app.logger.error(f"Export {export_id} processing failed: {e}")
+
+
+# One export at a time per worker; EXPORT_WORKERS threads per app. Exports are too
+# slow to finish at interpreter exit, so nothing is flushed then.
+_workers = BatchWriter('export-worker', _process_batch, workers_config='EXPORT_WORKERS', flush_at_exit=False)
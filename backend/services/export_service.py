@@ -5,7 +5,9 @@ import json
 from datetime import datetime, timedelta
 from io import StringIO, BytesIO
 from flask import current_app
+from config import ensure_dirs
 from models import db, Export, Page, Snippet, Project, Website
+from services import export_queue
 from services.auth_service import AuthorizationService, AuditService
 import pandas as pd
 
@@ -41,14 +43,8 @@ class ExportService:
             db.session.add(export)
             db.session.commit()
             
-            # Start export processing
-            try:
-                ExportService._process_export(export.id)
-            except Exception as e:
-                current_app.logger.error(f"Export processing failed: {e}")
-                export.status = 'failed'
-                export.error_message = str(e)
-                db.session.commit()
+            # Built by a background worker; clients poll the export's status for progress
+            export_queue.enqueue(export.id)
             
             # Log audit event
             AuditService.log_action(
@@ -64,7 +60,7 @@ class ExportService:
             
             return {
                 'success': True,
-                'message': 'Export created successfully',
+                'message': 'Export queued',
                 'export': export.to_dict()
             }
             
@@ -193,7 +189,7 @@ class ExportService:
     def _create_data_export(export, data):
         """Create CSV or Excel export"""
         export_dir = 'exports'
-        os.makedirs(export_dir, exist_ok=True)
+        ensure_dirs()
         
         file_path = os.path.join(export_dir, export.filename)
         
@@ -222,7 +218,7 @@ class ExportService:
     def _create_json_export(export, data):
         """Create JSON export"""
         export_dir = 'exports'
-        os.makedirs(export_dir, exist_ok=True)
+        ensure_dirs()
         
         file_path = os.path.join(export_dir, export.filename)
         
@@ -245,7 +241,7 @@ class ExportService:
     def _create_pdf_export(export):
         """Create PDF export (simplified - would need proper PDF library)"""
         export_dir = 'exports'
-        os.makedirs(export_dir, exist_ok=True)
+        ensure_dirs()
         
         file_path = os.path.join(export_dir, export.filename)
         
@@ -0,0 +1,54 @@
+# backend/services/login_queue.py
+from datetime import datetime
+from sqlalchemy import bindparam, update
+from models import db, User
+from services.batch_writer import BatchWriter
+from services.user_cache import invalidate_user
+
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0  # seconds to wait for a batch to fill
+
+_users = User.__table__
+_UPDATE_LAST_LOGIN = (
+    update(_users)
+    .where(_users.c.id == bindparam('user_id'))
+    .values(last_login=bindparam('ts'))
+)
+
+def record(user_id):
+    """Queue a login timestamp to be written by the background writer"""
+    _writer.put((int(user_id), datetime.utcnow()))
+
+
+def flush():
+    """Synchronously write whatever is still queued (best effort, used at exit)"""
+    _writer.flush()
+
+
+def _write_batch(app, batch):
+    """Update last_login for a batch of logins in a single executemany transaction"""
+    # Repeat logins by the same user collapse to the latest one
+    latest = {}
+    for user_id, ts in batch:
+        latest[user_id] = max(ts, latest.get(user_id, ts))
+    
+    with app.app_context():
+        try:
+            db.session.execute(
+                _UPDATE_LAST_LOGIN,
+                [{'user_id': user_id, 'ts': ts} for user_id, ts in latest.items()]
+            )
+            db.session.commit()
+        
+        except Exception as e:
+            app.logger.error(f"Last login batch write error ({len(latest)} users): {e}")
+            db.session.rollback()
+            return
+    
+    # Cached profiles carry last_login
+    for user_id in latest:
+        invalidate_user(user_id)
+
+
+# Each app's logins are written by its own thread, to its own database
+_writer = BatchWriter('login-writer', _write_batch, BATCH_SIZE, FLUSH_INTERVAL)
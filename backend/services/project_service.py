@@ -4,6 +4,7 @@ from flask import current_app
 from sqlalchemy import desc, func
 from models import db, Project, Website, User, project_collaborators
 from services.auth_service import AuthorizationService, AuditService
+from utils.validators import normalize_email
 
 
 class ProjectService:
@@ -309,7 +310,7 @@ class ProjectService:
                 }
             
             # Find collaborator user
-            collaborator = User.query.filter_by(email=collaborator_email.lower().strip()).first()
+            collaborator = User.query.filter_by(email=normalize_email(collaborator_email)).first()
             if not collaborator:
                 return {
                     'success': False,
@@ -15,9 +15,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from flask import current_app
+from sqlalchemy import func
 from models import db, Website, Page, Snippet
 from services.auth_service import AuditService
-from services.azure_openai_service import get_azure_openai_service
+from services.azure_openai_service import AI_SLOT_WAIT, get_azure_openai_service
 import concurrent.futures
 import threading
 
@@ -88,7 +89,7 @@ class ScrapingService:
     def scrape_single_page(self, website_id, url, use_selenium=False, depth=0):
         """Scrape a single page"""
         try:
-            website = Website.query.get(website_id)
+            website = db.session.get(Website, website_id)
             if not website:
                 return {
                     'success': False,
@@ -183,25 +184,33 @@ class ScrapingService:
             # AI analysis if available
             ai_service = get_azure_openai_service()
             if ai_service.is_available() and extracted_text:
-                # Summarize content
-                summary_result = ai_service.summarize_content(extracted_text)
-                if summary_result['success']:
-                    page.summary = summary_result['summary']
-                
-                # Extract entities
-                entities_result = ai_service.extract_entities(extracted_text)
-                if entities_result['success']:
-                    page.set_entities(entities_result['entities'])
-                
-                # Analyze sentiment
-                sentiment_result = ai_service.analyze_sentiment(extracted_text)
-                if sentiment_result['success']:
-                    page.sentiment_score = sentiment_result['sentiment']['score']
-            
-            db.session.commit()
+                # The three calls take seconds; they share the AI slots with rule suggestions,
+                # and when every slot is busy the page is saved without its analysis
+                ai_slots = current_app.extensions['ai_slots']
+                if ai_slots.acquire(timeout=AI_SLOT_WAIT):
+                    try:
+                        # Summarize content
+                        summary_result = ai_service.summarize_content(extracted_text)
+                        if summary_result['success']:
+                            page.summary = summary_result['summary']
+                        
+                        # Extract entities
+                        entities_result = ai_service.extract_entities(extracted_text)
+                        if entities_result['success']:
+                            page.set_entities(entities_result['entities'])
+                        
+                        # Analyze sentiment
+                        sentiment_result = ai_service.analyze_sentiment(extracted_text)
+                        if sentiment_result['success']:
+                            page.sentiment_score = sentiment_result['sentiment']['score']
+                    finally:
+                        ai_slots.release()
+                else:
+                    current_app.logger.warning(f"AI service busy, skipped analysis of {url}")
             
-            # Update website stats
-            website.total_pages = Page.query.filter_by(website_id=website_id).count()
+            # Update website stats in the page's transaction. total_pages is kept as the
+            # website's page count by adding the new page in SQL, instead of recounting them
+            website.total_pages = func.coalesce(Website.total_pages, 0) + 1
             website.last_crawled = datetime.utcnow()
             website.last_error = None
             db.session.commit()
@@ -218,7 +227,7 @@ class ScrapingService:
             
             # Update website error status
             try:
-                website = Website.query.get(website_id)
+                website = db.session.get(Website, website_id)
                 if website:
                     website.last_error = str(e)
                     db.session.commit()
@@ -320,7 +329,7 @@ class ScrapingService:
     def crawl_website(self, website_id, user_id, max_pages=None, use_selenium=False):
         """Crawl entire website following links up to specified depth"""
         try:
-            website = Website.query.get(website_id)
+            website = db.session.get(Website, website_id)
             if not website:
                 return {
                     'success': False,
@@ -454,7 +463,7 @@ class ScrapingService:
         try:
             from models import ScheduledJob
             
-            website = Website.query.get(website_id)
+            website = db.session.get(Website, website_id)
             if not website:
                 return {
                     'success': False,
@@ -525,7 +534,7 @@ class ScrapingService:
     def get_crawl_status(self, website_id):
         """Get current crawl status for website"""
         try:
-            website = Website.query.get(website_id)
+            website = db.session.get(Website, website_id)
             if not website:
                 return {
                     'success': False,
@@ -564,7 +573,7 @@ class ScrapingService:
     def stop_crawl(self, website_id, user_id):
         """Stop ongoing crawl for website"""
         try:
-            website = Website.query.get(website_id)
+            website = db.session.get(Website, website_id)
             if not website:
                 return {
                     'success': False,
@@ -0,0 +1,56 @@
+# backend/services/user_cache.py
+from collections import namedtuple
+from flask import current_app
+from sqlalchemy import select
+from models import db, User
+from utils.cache import TTLStore
+
+# Just what authorization checks read, so cached entries hold no ORM state
+UserView = namedtuple('UserView', ['id', 'email', 'role', 'is_active'])
+
+USER_CACHE_TTL = 60  # seconds
+
+_cache = TTLStore()
+_profiles = TTLStore()
+
+
+def get_user_view(user_id):
+    """Return a cached view of an active user, or None - handles both string and int user_id"""
+    try:
+        user_id = int(user_id)
+    except (ValueError, TypeError) as e:
+        current_app.logger.error(f"Invalid user ID format: {user_id}, error: {e}")
+        return None
+
+    view = _cache.get(user_id, USER_CACHE_TTL)
+    if view is None:
+        row = db.session.execute(
+            select(User.id, User.email, User.role, User.is_active).where(User.id == user_id)
+        ).first()
+        if not row or not row.is_active:
+            return None
+        view = UserView(*row)
+        _cache.set(user_id, view)
+    return view
+
+
+def get_user_profile(user_id):
+    """Return a cached to_dict() of an active user, or None"""
+    view = get_user_view(user_id)
+    if view is None:
+        return None
+
+    profile = _profiles.get(view.id, USER_CACHE_TTL)
+    if profile is None:
+        user = db.session.get(User, view.id)
+        if not user or not user.is_active:
+            return None
+        profile = user.to_dict()
+        _profiles.set(view.id, profile)
+    return profile
+
+
+def invalidate_user(user_id):
+    """Drop a user's cached view and profile after their details, role or status change"""
+    _cache.delete(int(user_id))
+    _profiles.delete(int(user_id))
@@ -105,18 +105,10 @@ def setup_database():
             # Create tables
             db.create_all()
             
-            # Create FTS5 virtual table
-            from sqlalchemy import text
+            # Create FTS5 search tables, their sync triggers and indexes
             try:
-                db.session.execute(text("""
-                    CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
-                        page_id,
-                        title,
-                        content,
-                        url
-                    );
-                """))
-                db.session.commit()
+                from db_setup import create_tables
+                create_tables(app)
                 print("✅ FTS5 search index created")
             except Exception as e:
                 print(f"⚠️  FTS5 setup warning: {e}")
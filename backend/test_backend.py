@@ -485,6 +485,85 @@ class BlitzTester:
             self.log_test("Admin SQL Executor", False, "Failed to execute SQL", data)
             return False
     
+    def test_scraping_jobs_null_updated_at(self):
+        """Test cursor paging through the scraping jobs past a website with no updated_at"""
+        if not self.admin_token or 'website_id' not in self.test_data:
+            self.log_test("Scraping Jobs NULL updated_at", False, "No admin token or test website available")
+            return False
+        
+        website_id = self.test_data['website_id']
+        sql_data = {"sql": f"UPDATE websites SET updated_at = NULL WHERE id = {website_id}"}
+        response, data = self.make_request('POST', '/api/admin/sql/execute', sql_data, admin=True)
+        if not response or response.status_code != 200 or not data.get('success'):
+            self.log_test("Scraping Jobs NULL updated_at", False, "Failed to clear updated_at", data)
+            return False
+        
+        # One job per page, so the NULL row is both a page's last row and its cursor
+        seen_ids = []
+        cursor = ''
+        for _ in range(100):
+            response, data = self.make_request('GET', f'/api/scraping/jobs?per_page=1&cursor={cursor}')
+            if not response or response.status_code != 200 or not data.get('success'):
+                self.log_test("Scraping Jobs NULL updated_at", False, "Paging failed", data)
+                return False
+            
+            seen_ids.extend(job['id'] for job in data['jobs'])
+            cursor = data['pagination']['next_cursor']
+            if not cursor:
+                break
+        
+        if website_id in seen_ids and len(seen_ids) == len(set(seen_ids)):
+            self.log_test("Scraping Jobs NULL updated_at", True, f"Paged through {len(seen_ids)} jobs")
+            return True
+        else:
+            self.log_test("Scraping Jobs NULL updated_at", False, f"Website {website_id} missing or repeated in {seen_ids}")
+            return False
+    
+    def test_compressed_etag_revalidation(self):
+        """Test that the ETag of a compressed response revalidates to a 304"""
+        if not self.admin_token:
+            self.log_test("Compressed ETag Revalidation", False, "No admin token available")
+            return False
+        
+        url = f"{self.base_url}/api/admin/audit-logs?per_page=200"
+        headers = {'Authorization': f'Bearer {self.admin_token}', 'Accept-Encoding': 'gzip'}
+        
+        try:
+            first = requests.get(url, headers=headers, timeout=30)
+            etag = first.headers.get('ETag')
+            if first.status_code != 200 or not etag:
+                self.log_test("Compressed ETag Revalidation", False, f"No ETag on {first.status_code} response")
+                return False
+            
+            second = requests.get(url, headers={**headers, 'If-None-Match': etag}, timeout=30)
+        except requests.exceptions.RequestException as e:
+            self.log_test("Compressed ETag Revalidation", False, str(e))
+            return False
+        
+        encoding = first.headers.get('Content-Encoding', 'identity')
+        if second.status_code == 304:
+            self.log_test("Compressed ETag Revalidation", True, f"{encoding} response with ETag {etag} revalidated")
+            return True
+        else:
+            self.log_test("Compressed ETag Revalidation", False, f"{encoding} response with ETag {etag} got {second.status_code}")
+            return False
+    
+    def test_audit_logs_invalid_cursor(self):
+        """Test that a malformed audit log cursor is rejected with a 400"""
+        if not self.admin_token:
+            self.log_test("Audit Logs Invalid Cursor", False, "No admin token available")
+            return False
+        
+        response, data = self.make_request('GET', '/api/admin/audit-logs?cursor=not-a-cursor', admin=True)
+        
+        if response and response.status_code == 400 and not data.get('success'):
+            self.log_test("Audit Logs Invalid Cursor", True, "Malformed cursor rejected")
+            return True
+        else:
+            status = response.status_code if response else None
+            self.log_test("Audit Logs Invalid Cursor", False, f"Malformed cursor got {status}", data)
+            return False
+    
     def test_admin_get_users(self):
         """Test admin get users"""
         if not self.admin_token:
@@ -575,6 +654,9 @@ class BlitzTester:
         
         # Admin tests
         self.test_admin_sql_executor()
+        self.test_scraping_jobs_null_updated_at()
+        self.test_compressed_etag_revalidation()
+        self.test_audit_logs_invalid_cursor()
         self.test_admin_get_users()
         self.test_admin_system_status()
         
@@ -0,0 +1,79 @@
+# backend/utils/auth.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask_jwt_extended import JWTManager
+from utils.responses import prebuilt_json_response
+
+_TOKEN_EXPIRED = prebuilt_json_response({'success': False, 'message': 'Token has expired'}, 401)
+_TOKEN_INVALID = prebuilt_json_response({'success': False, 'message': 'Invalid token'}, 401)
+_TOKEN_MISSING = prebuilt_json_response({'success': False, 'message': 'Authorization token is required'}, 401)
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that remembers verified token claims until shortly before they expire
+    
+    Tokens are keyed by a blake2b digest, never stored raw. Only successfully
+    decoded tokens are cached, and blocklist/user-lookup callbacks still run
+    on every request since flask_jwt_extended applies them after decoding.
+    """
+    
+    def __init__(self, app=None, max_entries=10000, max_ttl=60, **kwargs):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._decoded = OrderedDict()
+        self._decoded_lock = threading.RLock()
+        super().__init__(app, **kwargs)
+    
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        # CSRF double-submit and expired-token decoding need the full check
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        
+        key = hashlib.blake2b(encoded_token.encode('utf-8'), digest_size=16).digest()
+        now = time.time()
+        
+        with self._decoded_lock:
+            entry = self._decoded.get(key)
+            if entry is not None:
+                expires_at, claims = entry
+                if now < expires_at:
+                    self._decoded.move_to_end(key)
+                    return dict(claims)
+                del self._decoded[key]
+        
+        claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        
+        ttl = min(claims.get('exp', now) - now, self.max_ttl)
+        if ttl > 0:
+            with self._decoded_lock:
+                self._decoded[key] = (now + ttl, dict(claims))
+                if len(self._decoded) > self.max_entries:
+                    self._decoded.popitem(last=False)
+        
+        return claims
+
+
+def attach_auth(app):
+    """Initialize JWT handling and its error callbacks on the app (once)"""
+    if 'flask-jwt-extended' in app.extensions:
+        return app.extensions['flask-jwt-extended']
+    
+    jwt = CachingJWTManager(app, max_ttl=app.config.get('JWT_DECODE_CACHE_TTL', 60))
+    
+    @jwt.expired_token_loader
+    def expired_token_callback(jwt_header, jwt_payload):
+        return _TOKEN_EXPIRED()
+    
+    @jwt.invalid_token_loader
+    def invalid_token_callback(error):
+        app.logger.error(f"Invalid token error: {error}")
+        return _TOKEN_INVALID()
+    
+    @jwt.unauthorized_loader
+    def missing_token_callback(error):
+        return _TOKEN_MISSING()
+    
+    return jwt
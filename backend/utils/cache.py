@@ -0,0 +1,35 @@
+# backend/utils/cache.py
+import threading
+import time
+
+
+class TTLStore:
+    """Thread-safe in-process cache whose entries expire after a per-call TTL"""
+    
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key, ttl):
+        """Return the cached value for key, or None if missing or older than ttl seconds"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+        return None
+    
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+    
+    def get_or_set(self, key, ttl, loader):
+        """Return the cached value for key, calling loader() to refresh it when stale"""
+        value = self.get(key, ttl)
+        if value is None:
+            value = loader()
+            self.set(key, value)
+        return value
+    
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
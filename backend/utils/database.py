@@ -0,0 +1,22 @@
+# backend/utils/database.py
+from sqlalchemy import event
+
+# Applied to every new SQLite connection: WAL lets readers proceed during writes,
+# NORMAL sync is safe under WAL, and the rest keep temp data and pages in memory
+SQLITE_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-65536;
+"""
+
+
+def configure_sqlite_engine(engine):
+    """Register connection PRAGMAs on a SQLite engine (no-op for other databases)"""
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        dbapi_connection.executescript(SQLITE_PRAGMAS)
@@ -1,9 +1,34 @@
 # backend/utils/decorators.py
+import time
 from functools import wraps
-from flask import jsonify, current_app
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
-from services.auth_service import AuthService, AuthorizationService
+from flask import current_app, g
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from services.auth_service import AuthorizationService
+from services.user_cache import get_user_view
 from models import Project
+from utils.json import ojsonify
+
+
+def _fresh_role_claim(claims):
+    """Role embedded in the token, or None if it has none or it is past JWT_ROLE_CLAIM_MAX_AGE
+    
+    Older tokens fall back to the cached user record, so demotions and deactivations apply
+    mid-session.
+    """
+    role = claims.get('role')
+    if role is not None and time.time() - claims.get('iat', 0) <= current_app.config['JWT_ROLE_CLAIM_MAX_AGE']:
+        return role
+    return None
+
+
+def current_role():
+    """Role of the authenticated user, or None if they no longer exist or are inactive"""
+    claims = get_jwt()
+    role = _fresh_role_claim(claims)
+    if role is None:
+        user = get_user_view(claims['sub'])
+        role = user.role if user else None
+    return role
 
 
 def admin_required(f):
@@ -11,32 +36,50 @@ def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         try:
-            # Verify JWT token first
-            verify_jwt_in_request()
-            
-            user_id = get_jwt_identity()
-            current_app.logger.debug(f"Admin check - User ID from token: {user_id}")
+            if 'jwt_claims' not in g:
+                verify_jwt_in_request()
+                g.jwt_claims = get_jwt()
             
-            if not user_id:
-                current_app.logger.warning("Admin check failed - No user ID in token")
-                return jsonify({
-                    'success': False,
-                    'message': 'Authorization token required'
-                }), 401
+            role = _fresh_role_claim(g.jwt_claims)
+            if role is not None:
+                # Role was embedded in the token at login/refresh, no user lookup needed
+                if role != 'admin':
+                    current_app.logger.warning(f"Admin check failed - Token for user {g.jwt_claims.get('sub')} has role '{role}', expected 'admin'")
+                    return ojsonify({
+                        'success': False,
+                        'message': 'Admin access required'
+                    }), 403
+                return f(*args, **kwargs)
             
-            user = AuthService.get_user_by_id(user_id)
+            # Tokens issued before role claims, or past the claim's max age: check the user record
+            if 'current_user' in g:
+                # Identity already resolved once for this request by a blueprint hook
+                user_id = g.user_id
+                user = g.current_user
+            else:
+                user_id = get_jwt_identity()
+                current_app.logger.debug(f"Admin check - User ID from token: {user_id}")
+                
+                if not user_id:
+                    current_app.logger.warning("Admin check failed - No user ID in token")
+                    return ojsonify({
+                        'success': False,
+                        'message': 'Authorization token required'
+                    }), 401
+                
+                user = get_user_view(user_id)
             current_app.logger.debug(f"Admin check - User found: {user.email if user else 'None'}, Role: {user.role if user else 'None'}")
             
             if not user:
                 current_app.logger.warning(f"Admin check failed - User not found for ID: {user_id}")
-                return jsonify({
+                return ojsonify({
                     'success': False,
                     'message': 'User not found'
                 }), 404
             
             if not user.is_active:
                 current_app.logger.warning(f"Admin check failed - User not active: {user.email}")
-                return jsonify({
+                return ojsonify({
                     'success': False,
                     'message': 'Account is deactivated'
                 }), 403
@@ -44,7 +87,7 @@ def admin_required(f):
             # Check for admin role explicitly
             if user.role != 'admin':
                 current_app.logger.warning(f"Admin check failed - User {user.email} has role '{user.role}', expected 'admin'")
-                return jsonify({
+                return ojsonify({
                     'success': False,
                     'message': 'Admin access required'
                 }), 403
@@ -54,7 +97,7 @@ def admin_required(f):
             
         except Exception as e:
             current_app.logger.error(f"Admin check error: {e}")
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Authorization failed'
             }), 500
@@ -70,24 +113,24 @@ def project_access_required(f):
             verify_jwt_in_request()
             
             user_id = get_jwt_identity()
-            user = AuthService.get_user_by_id(user_id)
+            user = get_user_view(user_id)
             project_id = kwargs.get('project_id')
             
             if not user or not project_id:
-                return jsonify({
+                return ojsonify({
                     'success': False,
                     'message': 'Invalid request'
                 }), 400
             
             project = Project.query.get(project_id)
             if not project:
-                return jsonify({
+                return ojsonify({
                     'success': False,
                     'message': 'Project not found'
                 }), 404
             
             if not AuthorizationService.can_access_project(user, project):
-                return jsonify({
+                return ojsonify({
                     'success': False,
                     'message': 'Access denied'
                 }), 403
@@ -95,7 +138,7 @@ def project_access_required(f):
             return f(*args, **kwargs)
         except Exception as e:
             current_app.logger.error(f"Project access check error: {e}")
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'message': 'Authorization failed'
             }), 500
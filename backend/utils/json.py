@@ -0,0 +1,44 @@
+# backend/utils/json.py
+import orjson
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson
+    
+    Dates are passed through to Flask's default handler so responses keep the
+    same HTTP-date format that jsonify produced with the stdlib encoder.
+    """
+    
+    def _options(self, sort_keys):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+    
+    def dumps(self, obj, **kwargs):
+        option = self._options(kwargs.get('sort_keys', self.sort_keys))
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode('utf-8')
+    
+    def dumps_bytes(self, obj):
+        """Serialize to UTF-8 bytes for writing straight into a response body"""
+        return orjson.dumps(obj, default=self.default, option=self._options(self.sort_keys))
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Hand orjson's bytes straight to the response, skipping the str round-trip
+        body = self.dumps_bytes(obj)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def ojsonify(obj, status=200):
+    """Serialize obj with the app's orjson provider straight into a JSON response"""
+    return current_app.response_class(
+        current_app.json.dumps_bytes(obj) + b'\n', status=status, mimetype='application/json'
+    )
@@ -0,0 +1,70 @@
+# backend/utils/pagination.py
+import base64
+import binascii
+from datetime import datetime
+import orjson
+from sqlalchemy import and_, false, or_
+
+
+def encode_cursor(sort_value, row_id):
+    """Opaque cursor pointing at the last row of a page; a NULL sort value is encoded as null"""
+    raw = orjson.dumps([sort_value.isoformat() if sort_value is not None else None, row_id])
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Return (sort value or None, id) from a cursor, raising ValueError if it is malformed"""
+    try:
+        sort_value, row_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if sort_value is not None:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+def keyset_page(query, model, cursor, per_page, sort_key='created_at', nullable=False):
+    """Seek past the cursor, newest first, fetching one extra row to detect a next page
+
+    Works on both ORM queries and select() statements; an empty cursor starts at the top.
+    Rows are ordered by the sort_key timestamp column, with id breaking ties. With
+    nullable=True, rows whose sort value is NULL come last, ordered by id alone.
+    """
+    sort_column = getattr(model, sort_key)
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        if sort_value is None:
+            # Cursor inside the NULL tail; only a nullable column can have one
+            query = query.filter(and_(sort_column.is_(None), model.id < row_id) if nullable else false())
+        else:
+            after = [
+                sort_column < sort_value,
+                and_(sort_column == sort_value, model.id < row_id)
+            ]
+            if nullable:
+                # Every NULL row sorts after the cursor's dated row
+                after.append(sort_column.is_(None))
+            query = query.filter(or_(*after))
+
+    order = sort_column.desc().nulls_last() if nullable else sort_column.desc()
+    return query.order_by(order, model.id.desc()).limit(per_page + 1)
+
+
+def split_page(rows, per_page, sort_key='created_at'):
+    """Trim the lookahead row and return (rows, next_cursor)"""
+    if len(rows) <= per_page:
+        return rows, None
+
+    rows = rows[:per_page]
+    return rows, encode_cursor(getattr(rows[-1], sort_key), rows[-1].id)
+
+
+def cursor_pagination(per_page, cursor, next_cursor):
+    """Pagination block for keyset-paged responses"""
+    return {
+        'per_page': per_page,
+        'cursor': cursor or None,
+        'next_cursor': next_cursor,
+        'has_next': next_cursor is not None,
+        'has_prev': bool(cursor)
+    }
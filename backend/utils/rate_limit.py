@@ -0,0 +1,118 @@
+# backend/utils/rate_limit.py
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from limits import parse
+
+# Shared so blueprints can declare route limits; bound to the app by init_limiter
+limiter = Limiter(key_func=get_remote_address)
+
+
+class LocalRateBudget:
+    """Per-worker fixed-window hit counter that fronts the shared limiter storage
+
+    Hits it exempts are not lost: they are written to the shared storage in batches
+    of batch_ratio * limit, and whatever is still pending is written once the client
+    runs past the local budget or its window rolls over. A batch the storage refuses
+    means the limit is used up across workers, so the client's remaining requests
+    that window go through the limiter.
+    """
+
+    def __init__(self, limit_string, ratio=0.9, batch_ratio=0.1, max_clients=10000):
+        self.item = parse(limit_string)
+        self.window = self.item.get_expiry()
+        self.budget = int(self.item.amount * ratio)
+        self.batch = max(1, int(self.item.amount * batch_ratio))
+        self.max_clients = max_clients
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key):
+        """Count a hit for key and return (within local budget, [(key, hits to write to storage)])"""
+        now = time.monotonic()
+        flushes = []
+        with self._lock:
+            state = self._clients.pop(key, None)
+            if state is None or now - state[0] >= self.window:
+                if state is not None and state[2]:
+                    flushes.append((key, state[2]))
+                state = [now, 0, 0, False]  # window start, hits, unwritten hits, exhausted
+
+            state[1] += 1
+            within = not state[3] and state[1] <= self.budget
+            if within:
+                state[2] += 1
+            if state[2] and (not within or state[2] >= self.batch):
+                flushes.append((key, state[2]))
+                state[2] = 0
+            self._clients[key] = state
+
+            # Evict least recently seen clients, keeping their unwritten hits
+            if len(self._clients) > self.max_clients:
+                evicted_key, evicted = self._clients.popitem(last=False)
+                if evicted[2]:
+                    flushes.append((evicted_key, evicted[2]))
+
+        return within, flushes
+
+    def exhaust(self, key):
+        """Send the rest of key's window through the limiter"""
+        with self._lock:
+            state = self._clients.get(key)
+            if state is not None:
+                state[3] = True
+
+
+def route_limit(limit_value, **kwargs):
+    """Route-specific limit that is always checked against the shared storage
+
+    The local budget filter would otherwise exempt the route, since it skips every
+    limit for clients still within their default-limit budget.
+    """
+    def decorator(f):
+        limited = limiter.limit(limit_value, **kwargs)(f)
+        limited.route_rate_limited = True
+        return limited
+    return decorator
+
+
+# Requests within the local budget skip the storage round-trip entirely
+@limiter.request_filter
+def within_local_budget():
+    view = current_app.view_functions.get(request.endpoint)
+    if getattr(view, 'route_rate_limited', False):
+        return False
+    budget = current_app.extensions.get('rate_limit_budget')
+    if budget is None:
+        return False
+
+    # Default limits are counted per client and endpoint, as the limiter keys them
+    key = (get_remote_address(), request.endpoint or '')
+    within, flushes = budget.consume(key)
+    prefix = current_app.config.get('RATELIMIT_KEY_PREFIX')
+    for flush_key, hits in flushes:
+        identifiers = (prefix, *flush_key) if prefix else flush_key
+        if not limiter.limiter.hit(budget.item, *identifiers, cost=hits):
+            budget.exhaust(flush_key)
+            if flush_key == key:
+                within = False
+    return within
+
+
+def init_limiter(app):
+    """Bind the rate limiter, writing locally counted hits to the shared storage in batches"""
+    app.config.setdefault('RATELIMIT_STORAGE_URI', app.config['RATELIMIT_STORAGE_URL'])
+    app.config.setdefault('RATELIMIT_STRATEGY', 'fixed-window')
+    limiter.init_app(app)
+
+    app.extensions['rate_limit_budget'] = LocalRateBudget(
+        app.config['RATELIMIT_DEFAULT'],
+        ratio=app.config.get('RATELIMIT_LOCAL_BUDGET', 0.9),
+        batch_ratio=app.config.get('RATELIMIT_LOCAL_BATCH', 0.1)
+    )
+
+    return limiter
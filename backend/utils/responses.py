@@ -0,0 +1,35 @@
+# backend/utils/responses.py
+import hashlib
+import re
+import orjson
+from flask import current_app, request
+
+# Encoding suffix Flask-Compress adds to a compressed response's ETag
+_ENCODED_ETAG_RE = re.compile(r':(?:br|gzip|deflate|zstd)"')
+
+
+def prebuilt_json_response(payload, status):
+    """Serialize a fixed payload once and return a factory for fresh responses carrying it"""
+    body = orjson.dumps(payload)
+    
+    def build_response():
+        return current_app.response_class(body, status=status, mimetype='application/json')
+    
+    return build_response
+
+
+def conditional_response(response, max_age=15):
+    """Tag a response with a content ETag so unchanged polls get an empty 304
+    
+    Flask-Compress appends the encoding to the ETag of a compressed response
+    ("<hash>:br"), so that suffix is ignored when comparing If-None-Match.
+    """
+    response.set_etag(hashlib.blake2b(response.get_data(), digest_size=8).hexdigest())
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    
+    if_none_match = request.environ.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and ':' in if_none_match:
+        environ = dict(request.environ, HTTP_IF_NONE_MATCH=_ENCODED_ETAG_RE.sub('"', if_none_match))
+        return response.make_conditional(environ)
+    return response.make_conditional(request)
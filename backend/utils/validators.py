@@ -1,5 +1,17 @@
 # backend/utils/validators.py
 import re
+from functools import lru_cache
+
+# Simple but effective email regex
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+_URL_RE = re.compile(
+    r'^https?://'  # http:// or https://
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
+    r'localhost|'  # localhost...
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
 
 
 def validate_email(email):
@@ -7,9 +19,12 @@ def validate_email(email):
     if not email or not isinstance(email, str):
         return False
     
-    # Simple but effective email regex
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(email_pattern, email.strip()) is not None
+    return _EMAIL_RE.match(email.strip()) is not None
+
+
+def normalize_email(email):
+    """Canonical form emails are stored and looked up in"""
+    return email.strip().lower()
 
 
 def validate_password(password):
@@ -23,12 +38,11 @@ def validate_url(url):
     """Validate URL format"""
     if not url or not isinstance(url, str):
         return False
-        
-    url_pattern = re.compile(
-        r'^https?://'  # http:// or https://
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-        r'localhost|'  # localhost...
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-        r'(?::\d+)?'  # optional port
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-    return url_pattern.match(url.strip()) is not None
\ No newline at end of file
+    
+    return _url_matches(url.strip())
+
+
+@lru_cache(maxsize=4096)
+def _url_matches(url):
+    """Match a stripped URL once; re-submitted and batch-imported URLs hit the cache"""
+    return _URL_RE.match(url) is not None
\ No newline at end of file